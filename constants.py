@@ -22,6 +22,70 @@ class GoogleAuthConstants:
 
     GDRIVE_DEL_SCOPE = 'https://www.googleapis.com/auth/drive'
 
+class GDriveConstants:
+
+    # Max no of files downloaded concurrently (one Drive client per worker thread)
+    DOWNLOAD_CONCURRENCY = 4
+    LIST_PAGE_SIZE = 1000           # Max allowed by the Drive API
+    # Fetched by the listing so no per-file metadata call is needed before downloading
+    LIST_FILE_FIELDS = "nextPageToken, files(id, name, mimeType, md5Checksum, size, fileExtension, modifiedTime, createdTime)"
+
+    # Incremental listing: only files modified or created since the previous run which loaded every file
+    # of the folder, minus an overlap window (files re-listed in the overlap are skipped by the Ingestion ledger).
+    # Drive keeps both times when a file is moved into the folder: such files are only seen within the
+    # overlap window, delete the state file to force a full listing.
+    INCREMENTAL_LISTING = False
+    LISTING_STATE_PATH = Path("./cache/gdrive_listing_state.json")
+    LISTING_OVERLAP_HOURS = 72
+
+    # Discovery documents cached on disk for `DriveClientPool`
+    DISCOVERY_CACHE_DIR = Path("./cache/discovery")
+    DISCOVERY_CACHE_TTL_DAYS = 30
+    DISCOVERY_URL = "https://www.googleapis.com/discovery/v1/apis/{api}/{version}/rest"
+    DISCOVERY_TIMEOUT = 10
+
+    # CSV backups of the processed statements
+    BACKUP_GZIP = False                 # Upload as `<name>.csv.gz`
+    # Upload all the backups of a run concurrently at the end; pending backups are spilled to temp files
+    # and their statements are only marked as loaded in the Ingestion ledger once uploaded
+    BATCH_BACKUP_UPLOADS = False
+    BACKUP_UPLOAD_CONCURRENCY = 4
+    # CSV backup of a streamed statement is kept in memory up to this size, then spilled to a temp file
+    BACKUP_SPOOL_MAX_SIZE = 8 * 1024 * 1024
+
+    # Max no of calls in one Drive batch HTTP request
+    BATCH_REQUEST_LIMIT = 100
+
+    # Google Docs Editors files and their export formats
+    GOOGLE_DOCS_EXPORT_MIME_TYPES = {
+        'application/vnd.google-apps.document': 'application/pdf',  # Google Docs -> PDF
+        'application/vnd.google-apps.spreadsheet': 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet',  # Sheets -> XLSX
+        'application/vnd.google-apps.presentation': 'application/pdf',  # Slides -> PDF
+    }
+
+class UnlockerConstants:
+
+    # Password trials move to a process pool from this many candidate passwords
+    PARALLEL_PASSWORD_THRESHOLD = 200
+    PASSWORD_CHUNK_SIZE = 100
+    PASSWORD_WORKERS = 4
+    # File name pattern -> hash of the password which unlocked it last time
+    PASSWORD_HINTS_PATH = Path("./cache/password_hints.json")
+    # Keep unlocked statements encrypted on disk, the parser decrypts them in memory with their password
+    IN_MEMORY_DECRYPT = True
+    # Unlock stage: files unlocked in parallel and max seconds of password trials per file
+    UNLOCK_WORKERS = 4
+    FILE_TIMEOUT = 120
+    # Extra seconds the pool waits for a file before giving up on a worker stuck in a single decrypt
+    FILE_TIMEOUT_GRACE = 30
+
+class IntegrityConstants:
+
+    # File hashing (`DataIntegrityChecker`): read size, worker threads and optional secondary digest
+    HASH_CHUNK_SIZE = 1024 * 1024
+    HASH_WORKERS = min(32, os.cpu_count() or 4)
+    SECONDARY_DIGEST = 'blake2b'        # Stored in the Ingestion ledger, None to disable
+
 class DataParserConstants:
 
     # Constants for DataParser (Do not change.)
@@ -52,6 +116,32 @@ class DataParserConstants:
 
     BANKING_KEYWORD_URL = Path("./inputs/banking_keywords.txt")
 
+    # Spell correction of narration tokens:
+    #   'full'    -> pyspellchecker over the English dictionary
+    #   'banking' -> SymSpell deletion index over the banking keywords only (much faster)
+    SPELLCHECK_MODE = 'full'
+    SPELL_CACHE_SIZE = 50000        # Max memoized token corrections
+    # 'banking' mode: shorter tokens & English words are only matched exactly,
+    # tokens shorter than SPELL_SHORT_TOKEN_LENGTH are corrected by at most 1 edit (2 otherwise)
+    SPELL_MIN_TOKEN_LENGTH = 4
+    SPELL_SHORT_TOKEN_LENGTH = 6
+
+    # Precompiled categorizer snapshot (rebuilt automatically when the keyword file changes)
+    CATEGORIZER_SNAPSHOT = Path("./cache/categorizer_snapshot.pkl")
+
+    # Categorize only the unique narrations (reference numbers stripped) and map results back
+    DEDUP_CATEGORIZATION = True
+    # Keep narration results across runs (invalidated when the keyword file changes)
+    PERSIST_CATEGORIZATION_CACHE = False
+    CATEGORIZATION_CACHE_PATH = Path("./cache/categorization_cache.db")
+
+    # Page chunked parallel extraction (used only when `--page_workers` > 1)
+    PAGE_PARALLEL_MIN_PAGES = 40    # Smaller statements are extracted sequentially
+    PAGE_CHUNK_SIZE = 20            # Pages per worker task
+
+    # Streaming ingestion (used only when `--stream_batch` > 0)
+    STREAM_BATCH_SIZE = 500         # Records per DataFrame batch
+
 # Set Database Inputs as Constant
 class DBConstants:
     
@@ -70,8 +160,79 @@ class DBConstants:
             Balance NUMERIC,
             Bank TEXT,
             Subcategory TEXT,
-            Category TEXT 
+            Category TEXT,
+            RowHash TEXT,
+            LoadBatchId TEXT
         );
         """
+
+    # Natural key of a transaction, maintained by `DB_DeltaHandler` (not part of the parsed DataFrame)
+    ROW_HASH_COLUMN = "RowHash"
+    ROW_HASH_SOURCE_COLS = ["Bank", "Date", "Particulars", "Debit", "Credit", "Balance"]
+    INDEX_SQL_TEMPLATES = [
+        "CREATE UNIQUE INDEX IF NOT EXISTS UX_{table}_ROWHASH ON {table} (RowHash);",
+        "CREATE INDEX IF NOT EXISTS IX_{table}_BANK_DATE ON {table} (Bank, Date);",
+        "CREATE INDEX IF NOT EXISTS IX_{table}_LOAD_BATCH ON {table} (LoadBatchId);",
+    ]
+
+    # Load which inserted the row, used to scope the recategorization to new rows
+    LOAD_BATCH_COLUMN = "LoadBatchId"
+    TRANSACTION_T_MANAGED_COLS = {ROW_HASH_COLUMN, LOAD_BATCH_COLUMN}
+
+    # Recategorization rules, seeded into `RULES_TABLE` when it is empty.
+    # (rule_order, set_column, condition_column, LIKE pattern, new_value); the last matching rule wins
+    RULES_TABLE = "RECATEGORIZATION_RULES"
+    RECATEGORIZATION_PASSES = ["Subcategory", "Category"]
+    RULE_CONDITION_COLS = ["Particulars", "Subcategory", "Category"]
+    # Load batches already recategorized; the others (e.g. loaded by a crashed run) are picked up by the next run
+    RECATEGORIZED_BATCHES_TABLE = "RECATEGORIZED_LOAD_BATCHES"
+    RECATEGORIZATION_RULES = [
+        (1, 'Subcategory', 'Particulars', '%HUNGERBOX%', 'OFFICE FOOD'),
+        (2, 'Subcategory', 'Particulars', '%Daalchini%', 'OFFICE FOOD'),
+        (3, 'Subcategory', 'Particulars', '%Furlenco%', 'FURLENCO'),
+        (4, 'Subcategory', 'Particulars', '%swiggy%', 'SWIGGY'),
+        (5, 'Subcategory', 'Particulars', '%grocery%', 'GROCERY'),
+        (6, 'Subcategory', 'Particulars', '%newspa%', 'NEWSPAPER'),
+        (7, 'Subcategory', 'Particulars', '%yulu%', 'YULU'),
+        (8, 'Subcategory', 'Particulars', '%MOTOR%', 'BIKE'),
+        (9, 'Category', 'Particulars', '%Furlenco%', 'Bills'),
+        (10, 'Category', 'Particulars', '%swiggy%', 'Restaurant'),
+        (11, 'Category', 'Particulars', '%grocery%', 'Grocery'),
+        (12, 'Category', 'Particulars', '%newspa%', 'Bills'),
+        (13, 'Category', 'Particulars', '%yulu%', 'Transport'),
+        (14, 'Category', 'Subcategory', 'RD', 'Investment'),
+    ]
     
-    TRANSACTION_T_COLS = {"Date", "Particulars", "Credit", "Debit", "Balance", "Bank", "Subcategory", "Category"}
\ No newline at end of file
+    TRANSACTION_T_COLS = {"Date", "Particulars", "Credit", "Debit", "Balance", "Bank", "Subcategory", "Category"}
+
+    # Ledger of ingested statements keyed by content hash, already loaded files are skipped
+    INGESTION_LEDGER_TABLE = "INGESTION_LEDGER"
+    SKIP_INGESTED_FILES = True
+
+    # Bulk loader (`DB_DeltaHandler.load_delta_bulk`)
+    BULK_LOAD = True
+    BULK_LOAD_PRAGMAS = [
+        "PRAGMA journal_mode=WAL",
+        "PRAGMA synchronous=NORMAL",
+        "PRAGMA cache_size=-65536",     # 64 MB page cache
+        "PRAGMA temp_store=MEMORY",
+    ]
+    BULK_LOAD_TARGET_ROWS_PER_SEC = 50000
+    BULK_LOAD_MIN_ROWS_FOR_TARGET = 5000    # Smaller loads are dominated by fixed overhead
+
+# IFSC to Bank name resolution
+class IFSCConstants:
+
+    IFSC_API_URL = "https://ifsc.razorpay.com/{ifsc}"
+    API_TIMEOUT = 10                # seconds
+
+    # On-disk cache kept next to the Database
+    CACHE_DB_PATH = DBConstants.DB_PATH.parent / "ifsc_cache.db"
+    CACHE_TABLE = "IFSC_CACHE_T"
+    CACHE_TTL_DAYS = 180
+
+    # Local IFSC dump (CSV with `IFSC` and `BANK` columns) used for bulk preload
+    LOCAL_DUMP_PATH = Path("./inputs/ifsc_dump.csv")
+
+    # Set True to never call the IFSC API (cache / dump only)
+    OFFLINE = False
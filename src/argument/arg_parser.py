@@ -12,6 +12,10 @@ def parse_and_store_args():
     parser.add_argument('--src_gdrive', type=str, help='Path to source GCS folder')
     parser.add_argument('--backup', type=str, help='Path to backup folder')
     parser.add_argument('--reset', action='store_true', help='Reset saved arguments')
+    parser.add_argument('--workers', type=int, default=1, help='No of worker processes for extraction & categorization')
+    parser.add_argument('--page_workers', type=int, default=1, help='No of worker processes for page chunked extraction of large statements')
+    parser.add_argument('--stream_batch', type=int, default=0, help='Stream statements page by page into the DB in batches of N records (0 = off)')
+    parser.add_argument('--sql_every', type=int, default=0, help='Run the post-load SQL recategorization every N loaded files (0 = once at the end of the run)')
 
     args = parser.parse_args()
 
@@ -30,10 +34,20 @@ def parse_and_store_args():
             yaml.dump(to_save, f)
 
         logger.info("Arguments saved and reset.")
+        to_save['workers'] = args.workers
+        to_save['page_workers'] = args.page_workers
+        to_save['stream_batch'] = args.stream_batch
+        to_save['sql_every'] = args.sql_every
         return to_save
 
     # Load saved arguments if not resetting
     with open(CONFIG_FILE, 'r') as f:
         saved_args = yaml.safe_load(f)
         logger.info("Loaded saved arguments.!!")
-        return saved_args
+
+    # Run-time only arguments (not saved)
+    saved_args['workers'] = args.workers
+    saved_args['page_workers'] = args.page_workers
+    saved_args['stream_batch'] = args.stream_batch
+    saved_args['sql_every'] = args.sql_every
+    return saved_args
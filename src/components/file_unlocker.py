@@ -1,19 +1,68 @@
 from pypdf import PdfReader, PdfWriter
+from concurrent.futures import ProcessPoolExecutor, as_completed
+import multiprocessing
+import io
 import os
+import time
+import re
+import json
 import shutil
 import yaml
 import logging
 from src.components.logfactory import get_logger
+from constants import UnlockerConstants
 
 logger = get_logger(__name__)
 
+
+def try_password(reader: PdfReader, password) -> bool:
+    """ Decrypts `reader` with `password` and checks a page can be read; a failed `decrypt` leaves the reader untouched """
+    try:
+        if reader.decrypt(password):
+            _ = reader.pages[0]     # Force validation
+            return True
+    except Exception as e:
+        logger.warning(f"Password seemed to work but page read failed: {e}")
+    return False
+
+
+def find_password(pdf_bytes: bytes, passwords, deadline=None):
+    """
+    Returns the first password of `passwords` which decrypts the PDF (None if none works),
+    trying all of them on a single reader over the in-memory bytes.
+    Raises TimeoutError once `time.monotonic()` passes `deadline`.
+    Module level so it can run on a process pool.
+    """
+    reader = PdfReader(io.BytesIO(pdf_bytes))
+    for password in passwords:
+        if deadline is not None and time.monotonic() > deadline:
+            raise TimeoutError
+        if try_password(reader, password):
+            return password
+    return None
+
+
 class PDFUnlocker:
     """
     A class to handle unlocking password-protected PDF files.
     It attempts to decrypt PDFs using a list of passwords.
+
+    Every file is read from disk once, passwords are tried against a single in-memory reader
+    (on a process pool for long password lists) and the password which worked is remembered
+    per file name pattern, so the next statement of the same account is unlocked on the first try.
+    The hints file only keeps the position of that password in the configured list, never
+    anything derived from the password itself.
+
+    With `in_memory`, unlocked files are not rewritten: the password of every file is kept in
+    `self.passwords` for the parser to decrypt the statement in memory (see `ParsedStatement`),
+    so the plaintext PDF never touches the disk.
     """
-    def __init__(self, file_paths_list):
+    def __init__(self, file_paths_list, in_memory=UnlockerConstants.IN_MEMORY_DECRYPT):
         self.file_paths_list = file_paths_list
+        self.in_memory = in_memory
+        self.passwords = {}
+        self._passwords_cache = {}
+        self._hints = None
 
     def _read_passwords_from_yaml(self, filepath, key='passwords'):
         passwords = []
@@ -32,99 +81,290 @@ class PDFUnlocker:
             logger.error(f"An unexpected error occurred while reading the password file: {e}")
         return passwords
 
-    def unlock_single_pdf(self, pdf_path, passwords_source, passwords_key='passwords'):
+    def _get_passwords(self, passwords_source, passwords_key):
+        """ Password list from YAML (read once per source) or directly """
+        if isinstance(passwords_source, str):  # YAML file path
+            if (passwords_source, passwords_key) not in self._passwords_cache:
+                self._passwords_cache[(passwords_source, passwords_key)] = self._read_passwords_from_yaml(passwords_source, passwords_key)
+            return self._passwords_cache[(passwords_source, passwords_key)]
+        if isinstance(passwords_source, list):  # Direct list
+            return passwords_source
+        logger.error("Invalid password source. Must be a file path (str) or a list (list).")
+        return None
+
+    @staticmethod
+    def get_file_pattern(pdf_path):
+        """ File name with the digit runs masked, e.g. `acct_0525.pdf` and `acct_0625.pdf` -> `acct_#.pdf` """
+        return re.sub(r'\d+', '#', os.path.basename(pdf_path).lower())
+
+    def _load_hints(self):
+        """ File name pattern -> index of the password in the configured list """
+        if self._hints is None:
+            try:
+                with open(UnlockerConstants.PASSWORD_HINTS_PATH, 'r') as f:
+                    hints = json.load(f)
+            except FileNotFoundError:
+                hints = {}
+            except Exception as e:
+                logger.warning(f"Could not read password hints, ignoring them: {e}")
+                hints = {}
+            # Anything but an index (e.g. password hashes of older versions) is dropped from the file
+            self._hints = {pattern: index for pattern, index in hints.items() if isinstance(index, int)}
+            if len(self._hints) != len(hints):
+                self._save_hints()
+        return self._hints
+
+    def _save_hints(self):
+        try:
+            os.makedirs(os.path.dirname(UnlockerConstants.PASSWORD_HINTS_PATH), exist_ok=True)
+            with open(UnlockerConstants.PASSWORD_HINTS_PATH, 'w') as f:
+                json.dump(self._hints, f, indent=4)
+        except Exception as e:
+            logger.warning(f"Could not save password hints: {e}")
+
+    def _remember_password(self, pdf_path, password, passwords):
+        """ Records the position in `passwords` of the password which unlocked `pdf_path`, for its file name pattern """
+        if password not in passwords:
+            return
+        hints = self._load_hints()
+        pattern = self.get_file_pattern(pdf_path)
+        index = passwords.index(password)
+        if hints.get(pattern) == index:
+            return
+        hints[pattern] = index
+        self._save_hints()
+
+    def _order_passwords(self, pdf_path, passwords):
+        """ Moves the password remembered for the file name pattern to the front """
+        index = self._load_hints().get(self.get_file_pattern(pdf_path))
+        if index is None or not 0 <= index < len(passwords):
+            return passwords
+        return [passwords[index]] + passwords[:index] + passwords[index + 1:]
+
+    def _find_password(self, pdf_bytes, passwords, deadline=None, parallel=True):
+        """
+        Serial trial for short lists, chunks on a process pool for long ones.
+        The first (hinted) password is always tried serially before fanning out, and the pool is
+        dropped as soon as any chunk finds the password.
+        """
+        if not parallel or len(passwords) < UnlockerConstants.PARALLEL_PASSWORD_THRESHOLD:
+            return find_password(pdf_bytes, passwords, deadline)
+
+        found_password = find_password(pdf_bytes, passwords[:1], deadline)
+        if found_password is not None:
+            return found_password
+
+        passwords = passwords[1:]
+        chunk_size = UnlockerConstants.PASSWORD_CHUNK_SIZE
+        chunks = [passwords[i:i + chunk_size] for i in range(0, len(passwords), chunk_size)]
+        executor = ProcessPoolExecutor(max_workers=min(UnlockerConstants.PASSWORD_WORKERS, len(chunks)))
+        try:
+            futures = [executor.submit(find_password, pdf_bytes, chunk, deadline) for chunk in chunks]
+            for future in as_completed(futures):
+                found_password = future.result()
+                if found_password is not None:
+                    return found_password
+            return None
+        finally:
+            # Pending chunks are cancelled, the running ones finish in the background
+            executor.shutdown(wait=False, cancel_futures=True)
+
+    def _unlocked(self, reader, pdf_path):
+        """ Outside of the in-memory mode, replaces the file with its decrypted copy """
+        if not self.in_memory:
+            self._write_decrypted(reader, pdf_path)
+
+    @staticmethod
+    def _write_decrypted(reader, pdf_path):
+        """ Rewrites `pdf_path` without encryption """
         temp_output_pdf_path = pdf_path + ".unlocked_temp"
+        try:
+            writer = PdfWriter()
+            for page in reader.pages:
+                writer.add_page(page)
+            with open(temp_output_pdf_path, 'wb') as output_file:
+                writer.write(output_file)
+            os.remove(pdf_path)
+            shutil.move(temp_output_pdf_path, pdf_path)
+        finally:
+            if os.path.exists(temp_output_pdf_path):
+                os.remove(temp_output_pdf_path)
+
+    def _unlock(self, pdf_path, passwords_to_try, deadline=None, parallel=True):
+        """
+        Unlocks a single file without any bookkeeping, so it can also run in a worker process.
+        Outside of the in-memory mode, the file is rewritten decrypted.
 
+        Returns:
+            (bool, str): whether the file is usable and the password which decrypted it
+                         (None if the file is not encrypted).
+        """
         try:
-            reader = PdfReader(pdf_path)
+            with open(pdf_path, 'rb') as f:
+                pdf_bytes = f.read()
+
+            reader = PdfReader(io.BytesIO(pdf_bytes))
             if not reader.is_encrypted:
                 logger.debug(f"The PDF '{os.path.basename(pdf_path)}' is not encrypted. No action needed.")
-                return True
+                return True, None
 
             # Try unlocking with empty password explicitly first
-            temp_reader = PdfReader(pdf_path)
-            if temp_reader.decrypt(''):
-                try:
-                    _ = temp_reader.pages[0]  # Force validation
-                    reader = temp_reader
-                    logger.debug(f"PDF '{os.path.basename(pdf_path)}' unlocked with empty password.")
-                    writer = PdfWriter()
-                    for page in reader.pages:
-                        writer.add_page(page)
-                    with open(temp_output_pdf_path, 'wb') as output_file:
-                        writer.write(output_file)
-                    os.remove(pdf_path)
-                    shutil.move(temp_output_pdf_path, pdf_path)
-                    return True
-                except Exception as e:
-                    logger.warning(f"PDF '{os.path.basename(pdf_path)}' decrypted with empty password but failed to read pages: {e}")
-
-            # Get password list from YAML or directly
-            if isinstance(passwords_source, str):  # YAML file path
-                passwords_to_try = self._read_passwords_from_yaml(passwords_source, passwords_key)
-                if not passwords_to_try:
-                    logger.error(f"No passwords loaded from '{passwords_source}'. Cannot proceed with '{os.path.basename(pdf_path)}'.")
-                    return False
-            elif isinstance(passwords_source, list):  # Direct list
-                passwords_to_try = passwords_source
-            else:
-                logger.error("Invalid password source. Must be a file path (str) or a list (list).")
-                return False
+            if try_password(reader, ''):
+                logger.debug(f"PDF '{os.path.basename(pdf_path)}' unlocked with empty password.")
+                self._unlocked(reader, pdf_path)
+                return True, ''
 
-            found_password = None
+            if not passwords_to_try:
+                logger.error(f"No passwords loaded. Cannot proceed with '{os.path.basename(pdf_path)}'.")
+                return False, None
 
-            for password in passwords_to_try:
-                try:
-                    temp_reader = PdfReader(pdf_path)
-                    if temp_reader.decrypt(password):
-                        try:
-                            _ = temp_reader.pages[0]
-                            found_password = password
-                            reader = temp_reader
-                            logger.debug(f"PDF '{os.path.basename(pdf_path)}' unlocked with password.")
-                            break
-                        except Exception as e:
-                            logger.warning(f"Password '{password}' seemed to work but page read failed: {e}")
-                except Exception as e:
-                    logger.error(f"  Error trying password for '{os.path.basename(pdf_path)}': {e}")
-                    continue
-
-            if found_password:
-                writer = PdfWriter()
-                for page in reader.pages:
-                    writer.add_page(page)
-
-                with open(temp_output_pdf_path, 'wb') as output_file:
-                    writer.write(output_file)
-
-                os.remove(pdf_path)
-                shutil.move(temp_output_pdf_path, pdf_path)
-                logger.debug(f"Successfully unlocked and replaced '{pdf_path}'")
-                return True
+            found_password = self._find_password(pdf_bytes, passwords_to_try, deadline=deadline, parallel=parallel)
+
+            if found_password is not None:
+                reader.decrypt(found_password)
+                self._unlocked(reader, pdf_path)
+                logger.debug(f"Successfully unlocked '{pdf_path}'")
+                return True, found_password
             else:
                 logger.error(f"Failed to decrypt '{pdf_path}'. None of the provided passwords worked.")
-                return False
+                return False, None
 
+        except TimeoutError:
+            logger.error(f"Timed out while decrypting '{pdf_path}'.")
+            return False, None
         except FileNotFoundError:
             logger.error(f"Error: The file '{pdf_path}' was not found.")
-            return False
+            return False, None
         except Exception as e:
             logger.error(f"An unexpected error occurred while processing '{pdf_path}': {e}")
-            if os.path.exists(temp_output_pdf_path):
-                os.remove(temp_output_pdf_path)
+            return False, None
+
+    def _record_unlock(self, pdf_path, password, passwords):
+        """ Keeps the password for the in-memory decryption and remembers it for the file name pattern """
+        if password is None:
+            return
+        if self.in_memory:
+            self.passwords[pdf_path] = password
+        if password:
+            self._remember_password(pdf_path, password, passwords)
+
+    def unlock_single_pdf(self, pdf_path, passwords_source, passwords_key='passwords', timeout=UnlockerConstants.FILE_TIMEOUT):
+        passwords_to_try = self._get_passwords(passwords_source, passwords_key)
+        if passwords_to_try is None:
             return False
 
-    def process_all_unlocked_files(self, passwords_source, passwords_key='passwords'):
+        deadline = time.monotonic() + timeout if timeout else None
+        unlocked, password = self._unlock(pdf_path, self._order_passwords(pdf_path, passwords_to_try), deadline=deadline)
+        if unlocked:
+            self._record_unlock(pdf_path, password, passwords_to_try)
+        return unlocked
+
+    def process_all_unlocked_files(self, passwords_source, passwords_key='passwords',
+                                   max_workers=UnlockerConstants.UNLOCK_WORKERS, timeout=UnlockerConstants.FILE_TIMEOUT):
+        """
+        Unlocks every file of `file_paths_list`, on a process pool of `max_workers` when there is
+        more than one file. Every file gets at most `timeout` seconds of password trials.
+
+        The timeout is checked between password trials. On the pool, every result is also awaited
+        for at most `timeout` + `UnlockerConstants.FILE_TIMEOUT_GRACE` seconds, so a worker stuck
+        inside a single decrypt is given up on (the file is reported as not unlocked) and the pool
+        is terminated (see `_unlock_on_pool`). The serial path only has the cooperative check.
+
+        Returns:
+            (list, list): unlocked files and files which could not be unlocked, in input order.
+        """
         unlocked_files = []
         cannot_unlock_files = []
 
         logger.info(f"Attempting {len(self.file_paths_list)} files for Decryption Stage.")
+        start_time = time.perf_counter()
 
-        for pdf_path in self.file_paths_list:
-            if self.unlock_single_pdf(pdf_path, passwords_source, passwords_key):
+        if max_workers <= 1 or len(self.file_paths_list) <= 1:
+            results = []
+            for pdf_path in self.file_paths_list:
+                file_start = time.perf_counter()
+                results.append((self.unlock_single_pdf(pdf_path, passwords_source, passwords_key, timeout=timeout),
+                                None, time.perf_counter() - file_start))
+        else:
+            passwords_to_try = self._get_passwords(passwords_source, passwords_key)
+            if passwords_to_try is None:
+                return [], list(self.file_paths_list)
+
+            # Password order (hints) is resolved here, the workers only try the passwords.
+            # Hints & passwords are recorded here too, from the results.
+            ordered_passwords = [self._order_passwords(pdf_path, passwords_to_try) for pdf_path in self.file_paths_list]
+            results = self._unlock_on_pool(ordered_passwords, max_workers, timeout)
+            for pdf_path, (unlocked, password, _) in zip(self.file_paths_list, results):
+                if unlocked:
+                    self._record_unlock(pdf_path, password, passwords_to_try)
+
+        for pdf_path, (unlocked, _, elapsed) in zip(self.file_paths_list, results):
+            logger.debug(f"{'Unlocked' if unlocked else 'Could not unlock'} '{os.path.basename(pdf_path)}' in {elapsed:.2f}s")
+            if unlocked:
                 unlocked_files.append(pdf_path)
             else:
                 cannot_unlock_files.append(pdf_path)
 
-        logger.debug(f"Completed {len(unlocked_files)} files of Decryption")
+        logger.info(f"Decryption Stage completed for {len(unlocked_files)} of {len(self.file_paths_list)} files "
+                    f"in {time.perf_counter() - start_time:.2f}s")
         return unlocked_files, cannot_unlock_files
+
+    def _unlock_on_pool(self, ordered_passwords, max_workers, timeout):
+        """
+        Runs `unlock_file_worker` for every file on a `multiprocessing.Pool`, returns
+        (unlocked, password, elapsed seconds) in input order.
+
+        A file whose worker is stuck (or crashed, its task never returns) for more than the wait
+        timeout, or whose worker raised, is reported as not unlocked. After a timeout the pool is
+        terminated and a new one is started for the files still queued.
+        """
+        # Results are awaited in input order, so the wait of a file starts once the previous one is done
+        wait_timeout = timeout + UnlockerConstants.FILE_TIMEOUT_GRACE if timeout else None
+        results = [None] * len(self.file_paths_list)
+        pending = list(range(len(self.file_paths_list)))
+
+        while pending:
+            pool = multiprocessing.Pool(processes=min(max_workers, len(pending)))
+            timed_out = False
+            try:
+                async_results = {idx: pool.apply_async(unlock_file_worker, (self.file_paths_list[idx], ordered_passwords[idx],
+                                                                            self.in_memory, timeout))
+                                 for idx in pending}
+                for idx in pending:
+                    file_nm = os.path.basename(self.file_paths_list[idx])
+                    try:
+                        results[idx] = async_results[idx].get(timeout=wait_timeout)
+                    except multiprocessing.TimeoutError:
+                        logger.error(f"Gave up on '{file_nm}' after {wait_timeout}s, the worker is stuck or crashed.")
+                        results[idx] = (False, None, wait_timeout)
+                        timed_out = True
+                        break
+                    except Exception as e:
+                        logger.error(f"Worker failed while unlocking '{file_nm}': {e}")
+                        results[idx] = (False, None, 0.0)
+
+                # Files finished meanwhile are kept, the others go to the next pool
+                for idx in pending:
+                    if results[idx] is None and async_results[idx].ready():
+                        try:
+                            results[idx] = async_results[idx].get(timeout=0)
+                        except Exception as e:
+                            logger.error(f"Worker failed while unlocking '{os.path.basename(self.file_paths_list[idx])}': {e}")
+                            results[idx] = (False, None, 0.0)
+                pending = [idx for idx in pending if results[idx] is None]
+            finally:
+                if timed_out:
+                    pool.terminate()
+                else:
+                    pool.close()
+                pool.join()
+
+        return results
+
+
+def unlock_file_worker(pdf_path, passwords, in_memory, timeout):
+    """ Process pool entry point of `process_all_unlocked_files`: returns (unlocked, password, elapsed seconds) """
+    start_time = time.perf_counter()
+    deadline = time.monotonic() + timeout if timeout else None
+    unlocked, password = PDFUnlocker([], in_memory=in_memory)._unlock(pdf_path, passwords, deadline=deadline, parallel=False)
+    return unlocked, password, time.perf_counter() - start_time
@@ -0,0 +1,132 @@
+from collections import deque
+from typing import Dict, List, Optional
+# Rank returned when nothing matched
+NO_MATCH = float('inf')
+
+
+class AhoCorasickAutomaton:
+    """
+    Aho-Corasick automaton over a list of patterns.
+    The rank of a pattern is its position in the list (lower rank wins).
+
+    `min_rank_in(text)` returns the lowest rank among all the patterns occurring
+    in `text` in a single O(len(text)) scan.
+    """
+
+    def __init__(self, patterns: List[str]):
+        self.goto: List[Dict[str, int]] = [{}]
+        self.fail: List[int] = [0]
+        self.best: List[float] = [NO_MATCH]
+
+        for rank, pattern in enumerate(patterns):
+            node = 0
+            for char in pattern:
+                if char not in self.goto[node]:
+                    self.goto.append({})
+                    self.fail.append(0)
+                    self.best.append(NO_MATCH)
+                    self.goto[node][char] = len(self.goto) - 1
+                node = self.goto[node][char]
+            self.best[node] = min(self.best[node], rank)
+
+        self._build_failure_links()
+
+    def _build_failure_links(self):
+        # Breadth first, so the failure target of a node is always finalized before the node
+        queue = deque(self.goto[0].values())
+        while queue:
+            node = queue.popleft()
+            for char, child in self.goto[node].items():
+                fallback = self.fail[node]
+                while fallback and char not in self.goto[fallback]:
+                    fallback = self.fail[fallback]
+                target = self.goto[fallback].get(char, 0)
+                # Depth-1 nodes fail back to the root
+                self.fail[child] = target if target != child else 0
+
+                # A node also matches every pattern ending at its failure target
+                self.best[child] = min(self.best[child], self.best[self.fail[child]])
+                queue.append(child)
+
+    def min_rank_in(self, text: str) -> float:
+        """ Lowest rank of the patterns contained in `text` (NO_MATCH if none) """
+        goto, fail, best = self.goto, self.fail, self.best
+        node = 0
+        found = best[0]
+        for char in text:
+            while node and char not in goto[node]:
+                node = fail[node]
+            node = goto[node].get(char, 0)
+            if best[node] < found:
+                found = best[node]
+        return found
+
+
+class SubstringIndex:
+    """
+    Hash index of every substring of every pattern, mapped to the lowest rank of the
+    patterns containing it. Keywords are short, so this flattened suffix structure
+    answers "which pattern contains `text`" with a single O(len(text)) lookup.
+    """
+
+    def __init__(self, patterns: List[str]):
+        self.index: Dict[str, int] = {}
+        for rank, pattern in enumerate(patterns):
+            for start in range(len(pattern) + 1):
+                for end in range(start, len(pattern) + 1):
+                    self.index.setdefault(pattern[start:end], rank)
+
+    def min_rank_of(self, text: str) -> float:
+        """ Lowest rank of the patterns containing `text` (NO_MATCH if none) """
+        return self.index.get(text, NO_MATCH)
+
+
+class KeywordIndex:
+    """
+    Precompiled bidirectional substring matcher.
+
+    `first_match(text)` returns the first pattern (in list order) for which
+    `pattern in text or text in pattern` holds, i.e. the same answer as a linear scan
+    over the patterns, in O(len(text)).
+    """
+
+    def __init__(self, patterns: List[str]):
+        self.patterns = list(patterns)
+        self.automaton = AhoCorasickAutomaton(self.patterns)
+        self.substrings = SubstringIndex(self.patterns)
+
+    def __len__(self):
+        return len(self.patterns)
+
+    def first_match_rank(self, text: str) -> float:
+        return min(self.automaton.min_rank_in(text), self.substrings.min_rank_of(text))
+
+    def first_match(self, text: str) -> Optional[str]:
+        rank = self.first_match_rank(text)
+        return None if rank == NO_MATCH else self.patterns[rank]
+
+
+class CategoryIndex:
+    """
+    Compiled vendor -> category index built once from the banking keyword file.
+
+    `get_category(particular)` gives the same category as scanning the vendor map in order
+    and returning the first vendor where `particular in vendor or vendor in particular`.
+    """
+
+    def __init__(self, vendor_to_category: Dict[str, str]):
+        self.vendor_to_category = dict(vendor_to_category)
+        self.categories = list(self.vendor_to_category.values())
+        self.vendor_index = KeywordIndex(list(self.vendor_to_category.keys()))
+
+    def __len__(self):
+        return len(self.categories)
+
+    def get_category(self, particular: str) -> Optional[str]:
+        if particular is None:
+            return None
+
+        # An exact vendor hit is found through the substring index as well, but an earlier
+        # vendor contained in / containing the particular still takes precedence
+        rank = self.vendor_index.first_match_rank(particular.lower())
+        return None if rank == NO_MATCH else self.categories[rank]
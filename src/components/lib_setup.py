@@ -1,6 +1,7 @@
 from src.components.logfactory import get_logger
 from typing import List, Dict
 import os
+import hashlib
 import nltk
 from constants import DataParserConstants
 
@@ -56,7 +57,8 @@ class LibResourceManager:
                             _, keywords = line.strip().split(':', 1)
                             keyword_items = [k.strip().lower() for k in keywords.split(',')]
                             all_keywords.extend(keyword_items)
-                all_keywords = list(set(all_keywords))
+                # De-duplicate keeping the file order, so keyword precedence is deterministic
+                all_keywords = list(dict.fromkeys(all_keywords))
                 return all_keywords
             except Exception as e:
                 logger.error(f'Error while getting Banking keyword as : {e}')
@@ -82,4 +84,34 @@ class LibResourceManager:
                 logger.error(f'Error while getting Category to Spectrum Mapper: {e}')
         return category_map
 
+    @classmethod
+    def get_keyword_file_hash(cls, keyword_dir) -> str:
+        """
+        Returns the SHA-256 of the banking keyword file. Used to invalidate anything
+        precompiled from the keyword file when the file changes.
+        Returns None if the file cannot be read, so nothing is cached against it.
+        """
+        sha256 = hashlib.sha256()
+        try:
+            with open(keyword_dir, 'rb') as file:
+                sha256.update(file.read())
+        except Exception as e:
+            logger.error(f'Error while hashing Banking keyword file: {e}')
+            return None
+        return sha256.hexdigest()
 
+    @classmethod
+    def get_nlp_resource_hash(cls) -> str:
+        """
+        Returns the SHA-256 of the NLTK corpora used by the categorizer (English stopwords & words).
+        Returns None if a corpus cannot be read.
+        """
+        sha256 = hashlib.sha256()
+        try:
+            for words in (nltk.corpus.stopwords.words('english'), nltk.corpus.words.words()):
+                sha256.update('\n'.join(words).encode('utf-8'))
+                sha256.update(b'\0')
+        except Exception as e:
+            logger.error(f'Error while hashing NLTK corpora: {e}')
+            return None
+        return sha256.hexdigest()
@@ -0,0 +1,97 @@
+from itertools import combinations
+from typing import Dict, Iterable, List, Optional, Set
+
+
+class SymSpellIndex:
+    """
+    SymSpell style deletion index for correcting tokens toward a small dictionary
+    (e.g. the banking keywords) instead of the full English dictionary.
+
+    Every dictionary word is indexed under all the strings obtained by deleting up to
+    `max_edit_distance` characters. A token is corrected by generating its own deletes
+    and verifying only the dictionary words sharing one of them, so no edit-distance-2
+    candidate set over the alphabet is ever generated.
+
+    Against a small dictionary almost any short token is within a couple of edits of some word
+    (e.g. `ok` -> `cc`), so tokens shorter than `min_token_length` and the `skip_words` (e.g. valid
+    English words) are only matched exactly, and tokens shorter than `short_token_length` are
+    corrected by at most one edit.
+    """
+
+    def __init__(self, words: List[str], max_edit_distance: int = 2, min_token_length: int = 4,
+                 short_token_length: int = 6, skip_words: Iterable[str] = None):
+        self.max_edit_distance = max_edit_distance
+        self.min_token_length = min_token_length
+        self.short_token_length = short_token_length
+        # Shared, not copied: the English word set is large
+        self.skip_words = skip_words if isinstance(skip_words, (set, frozenset)) else set(skip_words or ())
+        self.words = list(dict.fromkeys(word for word in words if word))
+        self.word_set = set(self.words)
+        self.deletes: Dict[str, List[int]] = {}
+
+        for rank, word in enumerate(self.words):
+            for delete in self._get_deletes(word):
+                self.deletes.setdefault(delete, []).append(rank)
+
+    def _get_deletes(self, word: str, max_edit_distance: int = None) -> Set[str]:
+        """ All strings obtained by deleting up to `max_edit_distance` characters (including the word) """
+        max_edit_distance = self.max_edit_distance if max_edit_distance is None else max_edit_distance
+        deletes = {word}
+        for distance in range(1, min(max_edit_distance, len(word)) + 1):
+            for positions in combinations(range(len(word)), distance):
+                deletes.add(''.join(char for i, char in enumerate(word) if i not in positions))
+        return deletes
+
+    @staticmethod
+    def edit_distance(source: str, target: str) -> int:
+        """ Optimal string alignment (Damerau-Levenshtein with adjacent transpositions) distance """
+        previous_row = None
+        row = list(range(len(target) + 1))
+        for i in range(1, len(source) + 1):
+            before_previous_row, previous_row = previous_row, row
+            row = [i] + [0] * len(target)
+            for j in range(1, len(target) + 1):
+                cost = 0 if source[i - 1] == target[j - 1] else 1
+                row[j] = min(previous_row[j] + 1, row[j - 1] + 1, previous_row[j - 1] + cost)
+                if (i > 1 and j > 1 and source[i - 1] == target[j - 2]
+                        and source[i - 2] == target[j - 1]):
+                    row[j] = min(row[j], before_previous_row[j - 2] + 1)
+        return row[len(target)]
+
+    def get_max_edit_distance(self, token: str) -> int:
+        """ Edit distance allowed for `token`: 0 for short / skipped tokens, 1 below `short_token_length` """
+        if len(token) < self.min_token_length or token.lower() in self.skip_words:
+            return 0
+        if len(token) < self.short_token_length:
+            return min(1, self.max_edit_distance)
+        return self.max_edit_distance
+
+    def correction(self, token: str) -> Optional[str]:
+        """
+        Returns the closest dictionary word within the edit distance allowed for `token`
+        (see `get_max_edit_distance`), ties broken by dictionary order, or None if there is no such word.
+        """
+        if not token:
+            return None
+        if token in self.word_set:
+            return token
+
+        max_edit_distance = self.get_max_edit_distance(token)
+        if max_edit_distance == 0:
+            return None
+
+        candidates = set()
+        for delete in self._get_deletes(token, max_edit_distance):
+            candidates.update(self.deletes.get(delete, ()))
+
+        best = None
+        for rank in sorted(candidates):
+            word = self.words[rank]
+            if abs(len(word) - len(token)) > max_edit_distance:
+                continue
+            distance = self.edit_distance(token, word)
+            if distance <= max_edit_distance and (best is None or distance < best[0]):
+                best = (distance, word)
+                if distance == 0:
+                    break
+        return best[1] if best else None
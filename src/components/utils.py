@@ -1,4 +1,4 @@
-from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
 from tqdm import tqdm
 from typing import List
 import os, shutil
@@ -9,6 +9,28 @@ def parallel_apply_process(df, func, column, max_workers=8):
         results = list(tqdm(executor.map(func, df[column]), total=len(df)))
     return results
 
+def parallel_map_process(func, items:List, *more_items:List, max_workers=8, initializer=None):
+    """
+    Applies `func` to every item on a process pool and yields the results
+    in the same order as `items`, as soon as each of them is ready.
+    Like `map`, extra lists in `more_items` are passed as additional positional arguments.
+    `func` (and `initializer`, run once per worker) must be picklable (module level) functions.
+    """
+    with ProcessPoolExecutor(max_workers=max_workers, initializer=initializer) as executor:
+        for result in executor.map(func, items, *more_items):
+            yield result
+
+def parallel_map_thread(func, items:List, max_workers=4):
+    """
+    Applies `func` to every item on a thread pool (I/O bound work such as network calls)
+    and returns the results in the same order as `items`.
+    """
+    items = list(items)
+    if max_workers <= 1 or len(items) <= 1:
+        return [func(item) for item in items]
+    with ThreadPoolExecutor(max_workers=min(max_workers, len(items))) as executor:
+        return list(executor.map(func, items))
+
 def get_file_nm_list(items:List):
     set_nm = []
     if items:
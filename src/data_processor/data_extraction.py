@@ -6,11 +6,13 @@ import contextlib
 import io
 import logging
 from itertools import chain
-from typing import List
+from concurrent.futures import ProcessPoolExecutor
+from typing import List, Iterable, Iterator
 from src.components.logfactory import get_logger
 import warnings
 import requests
-from constants import DataParserConstants
+from constants import DataParserConstants, IFSCConstants
+from src.db_operations.ifsc_cache import IFSCCache
 from datetime import datetime
 
 
@@ -22,15 +24,134 @@ warnings.filterwarnings("ignore")
 # Initialize logger for the ingestion process
 logger = get_logger(__name__)
 
+class ParsedStatement:
+    """
+    ParsedStatement opens a statement PDF once so that the parsed pages can be shared
+    between IFSC detection and table extraction.
+
+    pdfplumber caches the layout objects of every page it has parsed, so reading the
+    first page text and then extracting tables from the same page object does not
+    repeat the layout analysis or reopen the file.
+
+    Encrypted statements are opened with their `password` and decrypted in memory
+    by pdfplumber, so the plaintext PDF never has to be written to disk.
+    """
+
+    def __init__(self, file_dir, password: str = None):
+        """
+        Initializes the ParsedStatement with the file directory.
+
+        Args:
+            file_dir (str | file-like): The path to the input file, or an in-memory PDF buffer.
+            password (str): Password of an encrypted statement.
+        """
+        self.file_dir = file_dir
+        self.password = password
+        self.pdf = None
+        self._first_page_text = None
+
+    def __enter__(self):
+        return self.open()
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def open(self):
+        """ Opens the PDF if it is not already open and returns the ParsedStatement """
+        if self.pdf is None:
+            with contextlib.redirect_stderr(io.StringIO()):
+                self.pdf = pdfplumber.open(self.file_dir, password=self.password)
+        return self
+
+    def close(self):
+        """ Closes the underlying PDF and releases the cached pages """
+        if self.pdf is not None:
+            self.pdf.close()
+            self.pdf = None
+
+    @property
+    def pages(self):
+        """ Returns the pages of the opened PDF """
+        return self.open().pdf.pages
+
+    def get_first_page_text(self) -> str:
+        """
+        Extracts the text data from the first page of the PDF once and caches it.
+
+        Returns:
+            str: Extracted text from the first page of the PDF.
+        """
+        if self._first_page_text is None:
+            with contextlib.redirect_stderr(io.StringIO()):
+                self._first_page_text = self.pages[0].extract_text()
+        return self._first_page_text
+
+
+def extract_page_table(page, table_horizon=False):
+    """
+    Extracts the table of a single pdfplumber page.
+
+    Args:
+        page (pdfplumber.page.Page): The page to extract from.
+        table_horizon (bool): If True, processes the table in horizontal format.
+
+    Returns:
+        list: Rows of the page table, or None if the page has no table.
+    """
+    if table_horizon:
+        return page.extract_table(table_settings=DataParserConstants.TABLE_SETTING)
+    return page.extract_table()
+
+
+def release_page(page):
+    """
+    Drops the layout objects pdfplumber cached while parsing `page`, so a streamed
+    statement does not keep every parsed page in memory.
+    """
+    # `Page.close` (pdfplumber >= 0.10) also clears the text map cache, older versions only have `flush_cache`
+    release = getattr(page, 'close', None) or getattr(page, 'flush_cache', None)
+    if release is not None:
+        release()
+
+
+def extract_page_chunk(file_dir, page_numbers: List[int], table_horizon=False, password: str = None) -> List:
+    """
+    Process pool worker: opens the statement and extracts the table rows of the given pages.
+
+    Args:
+        file_dir (str): The path to the input file.
+        page_numbers (list): Zero based page numbers to extract, in order.
+        table_horizon (bool): If True, processes the table in horizontal format.
+        password (str): Password of an encrypted statement.
+
+    Returns:
+        list: Rows of all the page tables of the chunk, in page order.
+    """
+    with contextlib.redirect_stderr(io.StringIO()):
+        with ParsedStatement(file_dir, password=password) as document:
+            pages = document.pages
+            page_tables = [extract_page_table(pages[i], table_horizon) for i in page_numbers]
+    return list(chain.from_iterable(table for table in page_tables if table is not None))
+
+
 class DataHandler:
     """
     DataHandler is responsible for extracting text and IFSC code from the input file,
     and interacting with an API to get the bank name based on the IFSC code.
     """
 
-    def __init__(self, file_dir):
-        """ Initializes the DataHandler object with the given file path """
+    def __init__(self, file_dir, document: ParsedStatement = None, password: str = None):
+        """
+        Initializes the DataHandler object with the given file path.
+
+        Args:
+            file_dir (str): The path to the input file.
+            document (ParsedStatement): Already opened statement to reuse instead of reopening the file.
+            password (str): Password of an encrypted statement (defaults to the one of `document`).
+        """
         self.file_dir = file_dir
+        self.document = document
+        self.password = password if password is not None else getattr(document, 'password', None)
 
     def get_textdata_from_file(self) -> str:
         """
@@ -43,12 +164,11 @@ class DataHandler:
             Exception: If text extraction fails.
         """
         try:
-            with contextlib.redirect_stderr(io.StringIO()):
-                with pdfplumber.open(self.file_dir) as pdf:
-                    page = pdf.pages[0]
-                    text_data = page.extract_text()
+            if self.document is not None:
+                return self.document.get_first_page_text()
 
-                    return text_data
+            with ParsedStatement(self.file_dir, password=self.password) as document:
+                return document.get_first_page_text()
         except Exception as e:
             raise Exception(f"Error extracting text from `{self.file_dir}`: {e}")
 
@@ -75,7 +195,8 @@ class DataHandler:
         
     def get_bank_name_from_ifsc(self):
         """
-        Uses the extracted IFSC code to query the Razorpay API and get the bank name.
+        Resolves the bank name of the extracted IFSC code from the on-disk IFSC cache,
+        falling back to the Razorpay API (and caching the answer) on a cache miss.
 
         Returns:
             str: Bank name corresponding to the IFSC code.
@@ -86,13 +207,24 @@ class DataHandler:
         ifsc_code = self.get_account_ifsc()
         if not ifsc_code:
             raise Exception("No IFSC code found.")
-            
-        url = f"https://ifsc.razorpay.com/{ifsc_code}"
+
+        ifsc_cache = IFSCCache()
+        bank_name = ifsc_cache.get_bank_name(ifsc_code)
+        if bank_name:
+            return bank_name
+
+        if IFSCConstants.OFFLINE:
+            logger.warning(f"IFSC `{ifsc_code}` not found in cache and IFSC API is disabled (offline mode).")
+            return None
+
+        url = IFSCConstants.IFSC_API_URL.format(ifsc=ifsc_code)
         try:
-            response = requests.get(url)
+            response = requests.get(url, timeout=IFSCConstants.API_TIMEOUT)
             response.raise_for_status()  # Raise error for bad status
             response_data_rtrv = response.json()
-            return response_data_rtrv.get('BANK')
+            bank_name = response_data_rtrv.get('BANK')
+            ifsc_cache.put(ifsc_code, bank_name)
+            return bank_name
         except requests.exceptions.HTTPError:
             print("Invalid IFSC code or API error.")
             return None
@@ -105,42 +237,95 @@ class DataProcessor:
     DataProcessor handles the extraction, cleaning, and transformation of data from a PDF into a usable format.
     """
 
-    def __init__(self, file_dir):
+    # Supported date formats of the first column, in probing order
+    DATE_FORMATS = ("%d-%m-%Y", "%d/%m/%Y", "%d/%m/%y", "%d-%m-%y")
+    DATE_PREFILTER = re.compile(r'^\d{1,2}[-/]\d{1,2}[-/](?:\d{2}|\d{4})$')
+
+    # Date format detected per bank, shared by every DataProcessor of the process
+    date_format_cache = {}
+
+    def __init__(self, file_dir, document: ParsedStatement = None, bank: str = None, password: str = None):
         """
         Initializes the DataProcessor with the file directory.
 
         Args:
             file_dir (str): The path to the input file.
+            document (ParsedStatement): Already opened statement to reuse instead of reopening the file.
+            bank (str): Bank name of the statement, used to reuse its detected date format.
+            password (str): Password of an encrypted statement (defaults to the one of `document`).
         """
         self.file_dir = file_dir
+        self.document = document
+        self.password = password if password is not None else getattr(document, 'password', None)
+        self.bank = bank
         self.combined_data = []
 
-    def set_data_to_tabular(self, table_horizon=False):
+    def set_data_to_tabular(self, table_horizon=False, page_workers=1):
         """
         Converts the table data from the PDF into a list of lists (tabular format).
 
         Args:
             table_horizon (bool): If True, processes the table in horizontal format.
+            page_workers (int): If > 1, large statements are split into page chunks
+                                which are extracted on a process pool.
+
+        Returns:
+            list: A list of rows representing the table data.
+        """
+        if self.document is not None:
+            return self._extract_tables(self.document, table_horizon, page_workers)
+
+        with ParsedStatement(self.file_dir, password=self.password) as document:
+            return self._extract_tables(document, table_horizon, page_workers)
+
+    def _extract_tables(self, document: ParsedStatement, table_horizon=False, page_workers=1):
+        """
+        Extracts the tables of every page of an opened statement into `self.combined_data`.
+        Page tables are collected in page order and concatenated once at the end.
+
+        Args:
+            document (ParsedStatement): The opened statement.
+            table_horizon (bool): If True, processes the table in horizontal format.
+            page_workers (int): No of worker processes for page chunked extraction.
 
         Returns:
             list: A list of rows representing the table data.
         """
         with contextlib.redirect_stderr(io.StringIO()):
-            with pdfplumber.open(self.file_dir) as raw_data:
-                try:
+            try:
+                total_pages = len(document.pages)
+
+                if page_workers > 1 and total_pages >= DataParserConstants.PAGE_PARALLEL_MIN_PAGES:
+                    page_tables = self._extract_page_chunks_parallel(total_pages, table_horizon, page_workers)
+                else:
                     # Extracting the table from pages
-                    for i in range(len(raw_data.pages)):
-                        page = raw_data.pages[i]
-                        if table_horizon:
-                            table = page.extract_table(table_settings=DataParserConstants.TABLE_SETTING)
-                        else:       
-                            table = page.extract_table()
-                        if table is not None:
-                            self.combined_data = list(chain(self.combined_data, table))
-                    logger.debug(f"Data extracted successfully from `{self.file_dir}`")
-                except Exception as e:
-                    raise Exception(f"Error extracting table from {self.file_dir}: {e}")
+                    page_tables = [extract_page_table(page, table_horizon) for page in document.pages]
+
+                self.combined_data = list(chain.from_iterable(table for table in page_tables if table is not None))
+                logger.debug(f"Data extracted successfully from `{self.file_dir}`")
+            except Exception as e:
+                raise Exception(f"Error extracting table from {self.file_dir}: {e}")
         return self.combined_data
+
+    def _extract_page_chunks_parallel(self, total_pages: int, table_horizon: bool, page_workers: int) -> List:
+        """
+        Splits the pages into contiguous chunks and extracts them on a process pool.
+
+        Returns:
+            list: Rows of every chunk, in page order.
+        """
+        chunk_size = DataParserConstants.PAGE_CHUNK_SIZE
+        page_chunks = [list(range(start, min(start + chunk_size, total_pages)))
+                       for start in range(0, total_pages, chunk_size)]
+        logger.debug(f"Extracting {total_pages} pages in {len(page_chunks)} chunks with {page_workers} workers")
+
+        with ProcessPoolExecutor(max_workers=min(page_workers, len(page_chunks))) as executor:
+            # `map` returns the chunks in submission order, so the page order is preserved
+            return list(executor.map(extract_page_chunk,
+                                     [self.file_dir] * len(page_chunks),
+                                     page_chunks,
+                                     [table_horizon] * len(page_chunks),
+                                     [self.password] * len(page_chunks)))
     
     @staticmethod
     def header_cleaner(raw_data:List):
@@ -341,22 +526,10 @@ class DataProcessor:
                 all_records = raw_data[1:]
 
                 if table_horizon:
-                    index = 0
-                    while index < (len(all_records)-1):
-                        if len(all_records[index][1]) > len(all_records[index+1][1]):
-                            new_particular = all_records[index][1] + all_records[index+1][1]
-                            all_records[index][1] = new_particular
-                            index += 2
-                        else:
-                            index += 1
-
-                    # Removing Empty String after Cleaning 2nd Column
+                    # Merging the wrapped 2nd Column and removing statement banner rows
                     all_records = [
-                                    sub for sub in all_records
-                                    if not (
-                                        isinstance(sub, list) and
-                                        any(keyword in " ".join(sub).lower() for keyword in ["from :", "to :", "statement", "of account"])
-                                    )
+                                    sub for sub in self.merge_wrapped_particulars(all_records)
+                                    if not self.is_statement_banner(sub)
                                 ]
 
                     df = pd.DataFrame(all_records, columns=header)
@@ -364,18 +537,8 @@ class DataProcessor:
                     logger.debug(f'Converting to DataFrame for `{table_horizon}` Table Horizon')
                     df = pd.DataFrame(all_records, columns=header)
 
-
                 # Final Check to DataFrame
-                if not df.empty:
-                    # Filter rows where the first column has valid dd/mm/yyyy or dd/mm/yy format 
-                    # Changing the first column to string and removing leading/trailing spaces
-                    # Filter rows where the first column has valid date format
-                    df.iloc[:, 0] = df.iloc[:, 0].astype(str).str.strip()
-                    mask = df.iloc[:, 0].apply(self.is_valid_date)
-                    if mask.sum() == 0:
-                        logger.warning(f"No valid dates found in column 0. Sample values: {df.iloc[:, 0].unique()[:5]}")
-                    df = df[mask].reset_index(drop=True)
-
+                df = self.filter_valid_date_rows(df)
 
                 logger.debug(f"Data converted to DataFrame = Records:`{df.shape[0]}` Columns:`{df.shape[1]}")
                 return df
@@ -383,8 +546,215 @@ class DataProcessor:
                 logger.error(f"Error converting to DataFrame: {e}")
                 return pd.DataFrame()
 
+    @staticmethod
+    def merge_wrapped_particulars(records: Iterable[List]) -> Iterator[List]:
+        """
+        Merges the 2nd column (Particulars) of a record into the previous record when the
+        previous one is longer, i.e. the narration wrapped into the next row of a horizontal table.
+
+        Args:
+            records (Iterable): Records in statement order (may be a stream spanning pages).
+
+        Yields:
+            list: The same records, in order, with the wrapped narrations merged.
+        """
+        pending = None
+        for record in records:
+            if pending is None:
+                pending = record
+                continue
+
+            if len(pending[1]) > len(record[1]):
+                pending[1] = pending[1] + record[1]
+                yield pending
+                yield record
+                pending = None
+            else:
+                yield pending
+                pending = record
+
+        if pending is not None:
+            yield pending
+
+    @staticmethod
+    def is_statement_banner(record: List) -> bool:
+        """ Checks if the record is a statement banner row (From/To/Statement of account) """
+        return isinstance(record, list) and any(
+            keyword in " ".join(record).lower() for keyword in ["from :", "to :", "statement", "of account"]
+        )
+
+    def filter_valid_date_rows(self, df: pd.DataFrame) -> pd.DataFrame:
+        """
+        Keeps only the rows where the first column has a valid dd/mm/yyyy or dd/mm/yy date.
+
+        Args:
+            df (DataFrame): DataFrame built from the cleaned records.
+
+        Returns:
+            DataFrame: The rows with a valid date, re-indexed.
+        """
+        if df.empty:
+            return df
+
+        # Changing the first column to string and removing leading/trailing spaces
+        df.iloc[:, 0] = df.iloc[:, 0].astype(str).str.strip()
+        mask = self.get_valid_date_mask(df.iloc[:, 0])
+        if mask.sum() == 0:
+            logger.warning(f"No valid dates found in column 0. Sample values: {df.iloc[:, 0].unique()[:5]}")
+        return df[mask].reset_index(drop=True)
+
+    def iter_page_rows(self, table_horizon=False, page_workers=1) -> Iterator[List]:
+        """
+        Streams the table rows of the statement one page (or one page chunk) at a time.
+
+        Args:
+            table_horizon (bool): If True, processes the table in horizontal format.
+            page_workers (int): If > 1, large statements are extracted in page chunks on a process pool.
+
+        Yields:
+            list: Rows of a single page (or page chunk).
+        """
+        document = self.document if self.document is not None else ParsedStatement(self.file_dir, password=self.password)
+        try:
+            total_pages = len(document.pages)
+            if page_workers > 1 and total_pages >= DataParserConstants.PAGE_PARALLEL_MIN_PAGES:
+                yield from self._extract_page_chunks_parallel(total_pages, table_horizon, page_workers)
+            else:
+                for page in document.pages:
+                    with contextlib.redirect_stderr(io.StringIO()):
+                        table = extract_page_table(page, table_horizon)
+                    release_page(page)
+                    if table:
+                        yield table
+        except Exception as e:
+            raise Exception(f"Error extracting table from {self.file_dir}: {e}")
+        finally:
+            if document is not self.document:
+                document.close()
+
+    @staticmethod
+    def iter_cleaned_pages(page_rows: Iterable[List]) -> Iterator[List]:
+        """
+        Composable cleaning stage for streamed pages. Applies the same cleaners as the
+        batch pipeline to every page, and stops the stream at the statement footer.
+
+        Args:
+            page_rows (Iterable): Rows of each page, in page order.
+
+        Yields:
+            list: Cleaned rows of each page.
+        """
+        row_cleaners = (
+            DataProcessor.header_cleaner,
+            DataProcessor.blank_row_remover,
+            DataProcessor.next_line_char_remover,
+            DataProcessor.none_row_remover,
+        )
+        for rows in page_rows:
+            for cleaner in row_cleaners:
+                if not rows:
+                    break
+                rows = cleaner(rows)
+            if not rows:
+                continue
+
+            # Footer ends the statement: nothing after it (on any page) is kept
+            cleaned_rows = DataProcessor.footer_cleaner(rows)
+            if cleaned_rows:
+                yield cleaned_rows
+            if len(cleaned_rows) < len(rows):
+                break
+
+    def iter_dataframe_batches(self, cleaned_pages: Iterable[List], table_horizon: bool = False,
+                               batch_size: int = DataParserConstants.STREAM_BATCH_SIZE) -> Iterator[pd.DataFrame]:
+        """
+        Converts streamed cleaned pages into DataFrames of at most `batch_size` rows.
+        The first row of the statement is used as header for every batch.
+
+        Args:
+            cleaned_pages (Iterable): Cleaned rows of each page, in page order.
+            table_horizon (bool): If True, processes the table in horizontal format.
+            batch_size (int): Maximum records per DataFrame batch.
+
+        Yields:
+            DataFrame: Date filtered records of the batch.
+        """
+        records = chain.from_iterable(cleaned_pages)
+        header = next(records, None)
+        if header is None:
+            logger.warning(f"No data found..Dataframe creation cannot be performed")
+            return
+
+        if table_horizon:
+            records = (
+                sub for sub in self.merge_wrapped_particulars(records)
+                if not self.is_statement_banner(sub)
+            )
+
+        batch = []
+        for record in records:
+            batch.append(record)
+            if len(batch) >= batch_size:
+                yield from self._batch_to_dataframe(batch, header)
+                batch = []
+        if batch:
+            yield from self._batch_to_dataframe(batch, header)
+
+    def _batch_to_dataframe(self, batch: List, header: List) -> Iterator[pd.DataFrame]:
+        """ Builds and date filters a single DataFrame batch, yielding it only if it has records """
+        try:
+            df = self.filter_valid_date_rows(pd.DataFrame(batch, columns=header))
+        except Exception as e:
+            logger.error(f"Error converting batch to DataFrame: {e}")
+            return
+        logger.debug(f"Batch converted to DataFrame = Records:`{df.shape[0]}` Columns:`{df.shape[1]}")
+        if not df.empty:
+            yield df
+
+    def get_valid_date_mask(self, values: pd.Series) -> pd.Series:
+        """
+        Vectorized `is_valid_date`: a compiled regex prefilter drops the rows which cannot be
+        a date, then the remaining rows are parsed with explicit formats.
+
+        The format matching most rows is remembered per bank, and it is tried first on the
+        later batches/files of that bank. When it matches every candidate row, no other
+        format is probed.
+
+        Args:
+            values (Series): Stripped string values of the first column.
+
+        Returns:
+            Series: Boolean mask of the rows holding a valid date.
+        """
+        mask = pd.Series(False, index=values.index)
+        remaining = values.str.match(self.DATE_PREFILTER, na=False).astype(bool)
+
+        # Cached format of the bank first, then the remaining formats in probing order
+        cached_format = self.date_format_cache.get(self.bank)
+        formats = [cached_format] if cached_format else []
+        formats += [fmt for fmt in self.DATE_FORMATS if fmt != cached_format]
+
+        best_format, best_count = None, 0
+        for fmt in formats:
+            if not remaining.any():
+                break
+
+            parsed = pd.to_datetime(values[remaining], format=fmt, errors='coerce')
+            matched_index = parsed.index[parsed.notna()]
+            if len(matched_index) > best_count:
+                best_format, best_count = fmt, len(matched_index)
+
+            mask.loc[matched_index] = True
+            remaining.loc[matched_index] = False
+
+        if best_format and self.bank and best_format != cached_format:
+            logger.debug(f"Date format detected for `{self.bank}`: {best_format}")
+            self.date_format_cache[self.bank] = best_format
+
+        return mask
+
     def is_valid_date(self, val):
-        for fmt in ("%d-%m-%Y", "%d/%m/%Y", "%d/%m/%y", "%d-%m-%y"):
+        for fmt in self.DATE_FORMATS:
             try:
                 datetime.strptime(val, fmt)
                 return True
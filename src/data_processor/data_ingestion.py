@@ -1,8 +1,8 @@
 import re,os
 import pandas as pd
 from pathlib import Path
-from typing import Union
-from src.data_processor.data_extraction import DataHandler, DataProcessor
+from typing import Union, Iterator
+from src.data_processor.data_extraction import DataHandler, DataProcessor, ParsedStatement
 from src.components.logfactory import get_logger
 from constants import DataParserConstants
 from src.components.utils import get_file_nm_list
@@ -18,27 +18,39 @@ class DataOrchestrator:
 
     Attributes:
         src_file_path (Union[str, Path]): Path to the source file or folder.
+        page_workers (int): No of worker processes for page chunked table extraction.
+        password (str): Password of an encrypted statement, decrypted in memory.
         df_raw (pd.DataFrame): Raw DataFrame generated from the file.
         data_field_patterns (dict): Patterns to match column roles.
     """
 
-    def __init__(self, src_file_path: Union[str, Path]):
+    def __init__(self, src_file_path: Union[str, Path], page_workers: int = 1, password: str = None):
         """
         Initializes the DataOrchestrator with the file path and loads default column patterns.
+
+        Args:
+            src_file_path (Union[str, Path]): Path to the source file.
+            page_workers (int): No of worker processes for page chunked table extraction.
+            password (str): Password of an encrypted statement, decrypted in memory.
         """
         self.src_file_path = src_file_path
+        self.page_workers = page_workers
+        self.password = password
         self.df_raw = pd.DataFrame()
         self.data_field_patterns = DataParserConstants.COLUMN_PATTERN
 
-    def set_table_horizontal(self) -> bool:
+    def set_table_horizontal(self, document: ParsedStatement = None) -> bool:
         """
         Determines whether the input data is in horizontal table format,
         based on the bank name (inferred from IFSC code).
 
+        Args:
+            document (ParsedStatement): Already opened statement shared with table extraction.
+
         Returns:
             bool: True if table is horizontal, False otherwise.
         """
-        data_handle_obj = DataHandler(file_dir=self.src_file_path)
+        data_handle_obj = DataHandler(file_dir=self.src_file_path, document=document)
         bank_name = data_handle_obj.get_bank_name_from_ifsc()
 
         logger.info(f"Bank Name for the File: {bank_name}")
@@ -135,17 +147,34 @@ class DataOrchestrator:
         file_nm = os.path.basename(self.src_file_path)
         logger.info(f'Data Extraction for file : |`{file_nm}`|.......')
         logger.debug(f'Temp File Dir: {self.src_file_path}')
-        data_processor_obj = DataProcessor(file_dir=self.src_file_path)
 
-        # Step 1: Determine table orientation (horizontal or not)
-        bank, horizontal = self.set_table_horizontal()
-        logger.debug(f'Table Horizon:{horizontal}')
-        logger.debug(f'Data Cleaning for file: |`{file_nm}`|..........')
+        # The statement is parsed once and shared by IFSC detection and table extraction
+        with ParsedStatement(self.src_file_path, password=self.password) as document:
+            # Step 1: Determine table orientation (horizontal or not)
+            bank, horizontal = self.set_table_horizontal(document=document)
+            data_processor_obj = DataProcessor(file_dir=self.src_file_path, document=document, bank=bank)
+            logger.debug(f'Table Horizon:{horizontal}')
+            logger.debug(f'Data Cleaning for file: |`{file_nm}`|..........')
+
+            return self._run_cleaning_pipeline(data_processor_obj, bank, horizontal, file_nm)
 
+    def _run_cleaning_pipeline(self, data_processor_obj: DataProcessor, bank: str, horizontal: bool, file_nm: str) -> pd.DataFrame:
+        """
+        Extracts, cleans and standardizes the tabular data of an opened statement.
+
+        Args:
+            data_processor_obj (DataProcessor): Processor bound to the opened statement.
+            bank (str): Bank name of the statement.
+            horizontal (bool): Table orientation of the statement.
+            file_nm (str): File name used for logging.
+
+        Returns:
+            pd.DataFrame: Final cleaned and standardized DataFrame.
+        """
         try:
             
             # Step 2: Extract raw tabular data
-            all_data = data_processor_obj.set_data_to_tabular(table_horizon=horizontal)
+            all_data = data_processor_obj.set_data_to_tabular(table_horizon=horizontal, page_workers=self.page_workers)
             logger.info(f'Total Records of extracted Data: {len(all_data)}')
 
             # Step 3: Apply multiple cleaning steps
@@ -184,3 +213,37 @@ class DataOrchestrator:
 
         except Exception as e:
             logger.warning(f"Unexpected error in `get_ingestion_pipeline()` for file {self.src_file_path}: {str(e)}")
+
+    def iter_ingestion_batches(self, batch_size: int = DataParserConstants.STREAM_BATCH_SIZE) -> Iterator[pd.DataFrame]:
+        """
+        Streaming variant of `get_ingestion_pipeline`. Each page's rows flow through the
+        cleaning stages as they are extracted and are emitted as standardized DataFrame
+        batches, so peak memory stays flat regardless of statement length.
+
+        Args:
+            batch_size (int): Maximum records per DataFrame batch.
+
+        Yields:
+            pd.DataFrame: Cleaned and standardized batch with the `Bank` column.
+        """
+        file_nm = os.path.basename(self.src_file_path)
+        logger.info(f'Streaming Data Extraction for file : |`{file_nm}`|.......')
+
+        with ParsedStatement(self.src_file_path, password=self.password) as document:
+            bank, horizontal = self.set_table_horizontal(document=document)
+            data_processor_obj = DataProcessor(file_dir=self.src_file_path, document=document, bank=bank)
+            logger.debug(f'Table Horizon:{horizontal}')
+
+            page_rows = data_processor_obj.iter_page_rows(table_horizon=horizontal, page_workers=self.page_workers)
+            cleaned_pages = data_processor_obj.iter_cleaned_pages(page_rows)
+            batches = data_processor_obj.iter_dataframe_batches(cleaned_pages, table_horizon=horizontal, batch_size=batch_size)
+
+            total_records = 0
+            for batch in batches:
+                batch = self.set_standard_data_fields(df=batch)
+                batch['Bank'] = bank
+                total_records += len(batch)
+                logger.debug(f'Streamed batch of {len(batch)} records for file : |`{file_nm}`|')
+                yield batch
+
+            logger.info(f'Total Records after cleaning: `{total_records}`')
@@ -0,0 +1,113 @@
+import os
+import pandas as pd
+from tqdm import tqdm
+from typing import Iterator
+from src.data_processor.data_ingestion import DataOrchestrator
+from src.data_processor.data_transformer import DataTransformation
+from src.components.logfactory import get_logger
+from constants import DataParserConstants
+
+logger = get_logger(__name__)
+
+
+def categorize(df: pd.DataFrame, transformer: DataTransformation, show_progress=True) -> pd.DataFrame:
+    ''' Adds the `Subcategory` and `Category` columns to an extracted statement DataFrame '''
+
+    if DataParserConstants.DEDUP_CATEGORIZATION:
+        logger.info(f'Processing Transformation on `SUBCATEGORY`......')
+        df['Subcategory'] = transformer.categorize_particulars(
+            df['Particulars'],
+            use_result_cache=DataParserConstants.PERSIST_CATEGORIZATION_CACHE,
+            show_progress=show_progress)
+
+        logger.info(f'Processing Transformation on `CATEGORY`......')
+        df['Category'] = transformer.categorize_subcategories(df['Subcategory'])
+        return df
+
+    # Progress bar for categorization
+    if show_progress:
+        tqdm.pandas(desc="Categorizeing Data")
+
+    logger.info(f'Processing Transformation on `SUBCATEGORY`......')
+    particulars = df['Particulars']
+    apply_fn = particulars.progress_apply if show_progress else particulars.apply
+    df['Subcategory'] = apply_fn(transformer.particular_scrapper)
+
+    if 'Subcategory' in df.columns:
+        logger.info(f'Processing Transformation on `CATEGORY`......')
+        subcategory = df['Subcategory']
+        apply_fn = subcategory.progress_apply if show_progress else subcategory.apply
+        df['Category'] = apply_fn(transformer.category_mapper)
+
+    return df
+
+
+def extract_and_categorize(file_dir, show_progress=True, page_workers=1, password=None):
+    ''' Runs extraction and categorization for a single statement.
+
+        This is a module level function so that it can be shipped to the workers of a process pool.
+
+        Args:
+            file_dir: Path of the statement file
+            show_progress: Show the pandas progress bar while categorizing
+            page_workers: No of worker processes for page chunked table extraction of the file
+            password: Password of an encrypted statement, decrypted in memory
+
+        Returns:
+            pd.DataFrame with `Subcategory` and `Category` columns, or None if the file could not be processed
+    '''
+    file_nm = os.path.basename(file_dir)
+    try:
+        data_orch_obj = DataOrchestrator(file_dir, page_workers=page_workers, password=password)
+        df = data_orch_obj.get_ingestion_pipeline()
+
+        if not isinstance(df, pd.DataFrame) or df.empty or 'Particulars' not in df.columns:
+            logger.error(f'No usable data extracted from file - `{file_nm}`')
+            return None
+
+        logger.debug(f'Dataframe Generated for: |`{file_nm}`|')
+        logger.debug(f'Columns  {df.columns}')
+
+        transformer = DataTransformation.get_shared()
+        logger.info(f'Data Transformation for file - `{file_nm}` in progress.......')
+
+        return categorize(df, transformer, show_progress=show_progress)
+    except Exception as e:
+        logger.error(f'Error while extracting/categorizing file - `{file_nm}`: {e}')
+        return None
+
+
+def init_categorization_worker(fingerprint=None):
+    ''' Process pool initializer: loads the shared categorizer once per worker process '''
+    DataTransformation.get_shared(fingerprint=fingerprint)
+
+
+def extract_and_categorize_worker(file_dir, password=None, page_workers=1):
+    ''' Process pool entry point: same as `extract_and_categorize` without the progress bars '''
+    return extract_and_categorize(file_dir, show_progress=False, page_workers=page_workers, password=password)
+
+
+def iter_extract_and_categorize(file_dir, batch_size=DataParserConstants.STREAM_BATCH_SIZE, page_workers=1,
+                                password=None) -> Iterator[pd.DataFrame]:
+    ''' Streaming variant of `extract_and_categorize`.
+
+        Pages are cleaned as they are extracted and every batch of `batch_size` records
+        is categorized and yielded immediately, so DB inserts can start before the last page is parsed.
+
+        Yields:
+            pd.DataFrame batches with `Subcategory` and `Category` columns
+    '''
+    file_nm = os.path.basename(file_dir)
+    data_orch_obj = DataOrchestrator(file_dir, page_workers=page_workers, password=password)
+    transformer = None
+
+    for batch in data_orch_obj.iter_ingestion_batches(batch_size=batch_size):
+        if 'Particulars' not in batch.columns:
+            logger.error(f'No `Particulars` column found in streamed batch of file - `{file_nm}`')
+            continue
+
+        if transformer is None:
+            transformer = DataTransformation.get_shared()
+            logger.info(f'Data Transformation for file - `{file_nm}` in progress.......')
+
+        yield categorize(batch, transformer, show_progress=False)
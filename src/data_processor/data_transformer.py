@@ -1,12 +1,20 @@
 import pandas as pd
 import re
+import os
+import pickle
+import hashlib
+import tempfile
+from functools import lru_cache
 from typing import Dict, Set, List
 import nltk
 from tqdm import tqdm
 import logging
 from spellchecker import SpellChecker
 from src.components.lib_setup import LibResourceManager
+from src.components.keyword_index import CategoryIndex, KeywordIndex, NO_MATCH
+from src.components.spell_index import SymSpellIndex
 from src.components.logfactory import get_logger
+from src.db_operations.categorization_cache import CategorizationCache
 from constants import DataParserConstants
 
 # set logger
@@ -17,6 +25,13 @@ LibResourceManager.download_nlp_resource(['stopwords', 'words'])
 # REMOVE_WORDS = DataParserConstants.REMOVED_ENGLISH_WORDS
 
 class DataTransformation:
+
+    # Version of the pickled snapshot layout, bump when the instance attributes change
+    SNAPSHOT_VERSION = 2
+
+    # Process wide instance returned by `get_shared()`
+    _shared_instance = None
+
     def __init__(self):
         self.stopwords:Set = LibResourceManager.get_custom_stopwords(
             add_stop_words=DataParserConstants.REMOVED_ENGLISH_WORDS,
@@ -25,7 +40,125 @@ class DataTransformation:
         self.banking_keywords = LibResourceManager.get_custom_banking_keywords(
             keyword_dir=DataParserConstants.BANKING_KEYWORD_URL
             )
-        self.spellcheck = SpellChecker()
+        self.banking_keyword_set = set(self.banking_keywords)
+        self.embedded_keyword_index = KeywordIndex([keyword.lower() for keyword in self.banking_keywords])
+        self.spellcheck_mode = DataParserConstants.SPELLCHECK_MODE
+        if self.spellcheck_mode == 'banking':
+            # Corrects only toward the banking keywords, valid English words are left as they are
+            self.spellcheck = SymSpellIndex(self.banking_keywords, max_edit_distance=2,
+                                            min_token_length=DataParserConstants.SPELL_MIN_TOKEN_LENGTH,
+                                            short_token_length=DataParserConstants.SPELL_SHORT_TOKEN_LENGTH,
+                                            skip_words=self.english_words)
+        else:
+            self.spellcheck = SpellChecker()
+        self._set_correction_cache()
+        self.category_index = CategoryIndex(LibResourceManager.get_category_to_spectrum_mapper(
+            keyword_dir=DataParserConstants.BANKING_KEYWORD_URL
+            ))
+
+        # Identifies the categorization results of this instance (used by the persistent result cache)
+        self.fingerprint = self.get_fingerprint()
+
+    def _set_correction_cache(self):
+        """ Bounded LRU memo of spell corrections keyed on the cleaned token """
+        self.correct_spelling = lru_cache(maxsize=DataParserConstants.SPELL_CACHE_SIZE)(self.spellcheck.correction)
+
+    def __getstate__(self):
+        # The LRU wrapper is rebuilt after unpickling (snapshot / process pool)
+        state = self.__dict__.copy()
+        state.pop('correct_spelling', None)
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._set_correction_cache()
+
+    @classmethod
+    @lru_cache(maxsize=None)
+    def get_fingerprint(cls):
+        """
+        Hash of everything the categorizer is built from: snapshot layout, spellcheck settings, banking
+        keyword file, stopword constants and NLTK corpora. Keys the snapshot and the persistent
+        result cache; None (nothing is cached) when the keyword file or a corpus cannot be read.
+        Computed once per process, the inputs do not change during a run.
+        """
+        keyword_hash = LibResourceManager.get_keyword_file_hash(DataParserConstants.BANKING_KEYWORD_URL)
+        nlp_resource_hash = LibResourceManager.get_nlp_resource_hash()
+        if keyword_hash is None or nlp_resource_hash is None:
+            return None
+        parts = [
+            str(cls.SNAPSHOT_VERSION),
+            DataParserConstants.SPELLCHECK_MODE,
+            keyword_hash,
+            nlp_resource_hash,
+            ','.join(sorted(DataParserConstants.REMOVED_ENGLISH_WORDS)),
+            ','.join(sorted(DataParserConstants.DISCARD_STOPWORD)),
+            f'{DataParserConstants.SPELL_MIN_TOKEN_LENGTH}:{DataParserConstants.SPELL_SHORT_TOKEN_LENGTH}',
+        ]
+        return hashlib.sha256('\n'.join(parts).encode('utf-8')).hexdigest()
+
+    @classmethod
+    def get_shared(cls, snapshot_path=DataParserConstants.CATEGORIZER_SNAPSHOT, fingerprint=None):
+        """
+        Returns the long-lived categorizer of this process, building it only once per run.
+
+        The instance is loaded from the on-disk snapshot when it is still valid for the current
+        keyword file, so worker processes start warm. With `fork` the children inherit the
+        parent's instance directly. `fingerprint`, when given by the parent, saves the workers
+        from hashing the corpora again.
+        """
+        if cls._shared_instance is None:
+            cls._shared_instance = cls.load_snapshot(snapshot_path, fingerprint)
+        return cls._shared_instance
+
+    @classmethod
+    def load_snapshot(cls, snapshot_path=DataParserConstants.CATEGORIZER_SNAPSHOT, fingerprint=None):
+        """
+        Loads the precompiled categorizer from `snapshot_path` when its fingerprint matches.
+        Builds and saves a new snapshot if it is missing, outdated or unreadable.
+        """
+        if fingerprint is None:
+            fingerprint = cls.get_fingerprint()
+
+        if fingerprint is not None and os.path.exists(snapshot_path):
+            try:
+                with open(snapshot_path, 'rb') as f:
+                    snapshot = pickle.load(f)
+                if snapshot.get('fingerprint') == fingerprint:
+                    logger.debug(f'Categorizer loaded from snapshot `{snapshot_path}`')
+                    return snapshot['transformer']
+                logger.info(f'Categorizer snapshot is outdated, rebuilding.......')
+            except Exception as e:
+                logger.warning(f'Error while loading Categorizer snapshot `{snapshot_path}`: {e}')
+
+        transformer = cls()
+        transformer.save_snapshot(snapshot_path, fingerprint)
+        return transformer
+
+    def save_snapshot(self, snapshot_path=DataParserConstants.CATEGORIZER_SNAPSHOT, fingerprint=None):
+        """
+        Pickles the categorizer to `snapshot_path`, keyed by its fingerprint. Written to a unique
+        temporary file next to the snapshot and then renamed, so concurrent runs never share a temp file.
+        """
+        if fingerprint is None:
+            fingerprint = self.fingerprint
+        if fingerprint is None:
+            logger.warning(f'Categorizer inputs could not be fingerprinted, snapshot not saved')
+            return
+        temp_path = None
+        try:
+            snapshot_dir = os.path.dirname(snapshot_path) or '.'
+            os.makedirs(snapshot_dir, exist_ok=True)
+            with tempfile.NamedTemporaryFile(dir=snapshot_dir, prefix=f'{os.path.basename(snapshot_path)}.',
+                                             suffix='.tmp', delete=False) as f:
+                temp_path = f.name
+                pickle.dump({'fingerprint': fingerprint, 'transformer': self}, f, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(temp_path, snapshot_path)
+            logger.debug(f'Categorizer snapshot saved to `{snapshot_path}`')
+        except Exception as e:
+            logger.warning(f'Error while saving Categorizer snapshot `{snapshot_path}`: {e}')
+            if temp_path and os.path.exists(temp_path):
+                os.remove(temp_path)
 
     
     def is_stop_word(self, token):
@@ -57,7 +190,7 @@ class DataTransformation:
             Return: Boolean True / False
         """
         # token = re.sub(r'[^A-Za-z]', '', token)
-        if token.lower() in self.banking_keywords:
+        if token.lower() in self.banking_keyword_set:
             return token
         else:
             return None
@@ -83,6 +216,7 @@ class DataTransformation:
     def is_banking_keyword_with_corrected_spell(self, token):
         """
         Corrects the token using spellchecker and checks if it's a banking keyword.
+        Corrections are memoized, as narration tokens (UPI merchants etc.) repeat heavily.
         """
         # spell_check = SpellChecker()
         # spell_check.word_frequency.load_words(self.banking_keywords)
@@ -92,8 +226,8 @@ class DataTransformation:
             # logger.debug('Token became empty after cleaning, skipping.')
             return None
 
-        corrected_word = self.spellcheck.correction(token)
-        if corrected_word and corrected_word.lower() in self.banking_keywords:
+        corrected_word = self.correct_spelling(token)
+        if corrected_word and corrected_word.lower() in self.banking_keyword_set:
             # logger.debug(f'Corrected word: `{corrected_word}` for original token: `{token}`')
             return corrected_word
 
@@ -101,19 +235,21 @@ class DataTransformation:
 
     
     def get_embedded_word(self, clean_token):
-        """Checks if the token has any embedded form of a banking keyword or vice versa."""
+        """
+        Checks if the token has any embedded form of a banking keyword or vice versa.
+        Returns the first keyword (in keyword file order) matching either way, using
+        the precompiled Aho-Corasick / substring index instead of scanning every keyword.
+        """
         # clean_token = re.sub(r'[^A-Za-z]', '', token).lower()
         if not clean_token:
             return None
 
-        for keyword in self.banking_keywords:
-            keyword_lower = keyword.lower()
-
-            if keyword_lower in clean_token or clean_token in keyword_lower:
-                # logger.debug(f'Matched embedded keyword: `{keyword}` with token `{clean_token}`')
-                return keyword
+        rank = self.embedded_keyword_index.first_match_rank(clean_token)
+        if rank == NO_MATCH:
+            return None
 
-        return None
+        # logger.debug(f'Matched embedded keyword: `{keyword}` with token `{clean_token}`')
+        return self.banking_keywords[rank]
 
 
 
@@ -240,22 +376,65 @@ class DataTransformation:
             logger.error(f'Categorization error occurred: {e}', exc_info=True)
 
     def category_mapper(self, particular: str):
-        mapper_dict = LibResourceManager.get_category_to_spectrum_mapper(
-            keyword_dir=DataParserConstants.BANKING_KEYWORD_URL
-        )
-        # logger.debug(f'Mapping Particular: `{particular}` to Category using mapper_dict: {mapper_dict}')
-        if not mapper_dict:
+        """ Maps the scrapped particular to its category using the precompiled category index """
+        if not self.category_index:
             logger.warning("No category mapping found, returning empty dictionary.")
         
         if particular is None:
             # logger.debug('Particular is None, returning None')
             return None
-        
-        for scrap_particular, category in mapper_dict.items():
-            # logger.info(f'Checking : `{scrap_particular}`')
-            if particular.lower() in scrap_particular or scrap_particular in particular.lower():
-                # logger.info(f'Category found: {category} for Particular: {particular}')
-                return category
-        return None
 
+        return self.category_index.get_category(particular)
 
+    @staticmethod
+    def get_narration_key(text):
+        """
+        Normalizes a narration for memoization: purely numeric parts (UTR / reference numbers)
+        are replaced by `#`. Those parts never contribute letters to a token, so
+        `particular_scrapper` gives the same result for the key as for the narration.
+        """
+        if not isinstance(text, str):
+            return text
+        parts = re.split(r'[*,-/]', text)
+        return '/'.join('#' if part.strip().isdigit() else part for part in parts)
+
+    def categorize_particulars(self, particulars: pd.Series, use_result_cache=False, show_progress=False) -> pd.Series:
+        """
+        Deduplicated `particular_scrapper`: only the unique normalized narrations are
+        categorized and the results are mapped back to every row.
+
+        Args:
+            particulars: `Particulars` column
+            use_result_cache: Reuse / store results in the persistent categorization cache
+            show_progress: Show a progress bar over the unique narrations
+        Return: `Subcategory` Series aligned with `particulars`
+        """
+        keys = particulars.map(self.get_narration_key)
+        unique_keys = list(pd.unique(keys))
+
+        result_cache = CategorizationCache(fingerprint=self.fingerprint) if use_result_cache and self.fingerprint else None
+        results = result_cache.get_many(unique_keys) if result_cache else {}
+        pending_keys = [key for key in unique_keys if key not in results]
+        logger.debug(f'Categorizing {len(pending_keys)} unique narrations out of {len(particulars)} rows '
+                     f'({len(results)} from cache)')
+
+        new_results = {}
+        for key in tqdm(pending_keys, desc="Categorizeing Data", disable=not show_progress):
+            new_results[key] = self.particular_scrapper(key)
+
+        if result_cache:
+            result_cache.put_many({key: value for key, value in new_results.items() if isinstance(key, str)})
+        results.update(new_results)
+
+        return self._map_results(keys, results)
+
+    def categorize_subcategories(self, subcategories: pd.Series) -> pd.Series:
+        """ Deduplicated `category_mapper`: maps each unique subcategory once """
+        results = {key: self.category_mapper(key) for key in pd.unique(subcategories)}
+        return self._map_results(subcategories, results)
+
+    @staticmethod
+    def _map_results(keys: pd.Series, results: dict) -> pd.Series:
+        """ Vectorized map of per-key results back to the rows, keeping missing results as None """
+        mapped = keys.map(pd.Series(results, dtype=object))
+        return mapped.astype(object).where(mapped.notna(), None)
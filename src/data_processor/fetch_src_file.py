@@ -2,7 +2,9 @@ import os
 import json, shutil
 from src.components.file_unlocker import PDFUnlocker
 from src.components.logfactory import get_logger
-from constants import ConstantRetriever
+from constants import ConstantRetriever, DBConstants
+from src.utils.dq_integrity import DataIntegrityChecker
+from src.db_operations.ingestion_ledger import IngestionLedger
 from src.components.utils import get_file_nm_list
 
 logger = get_logger(__name__)
@@ -34,11 +36,26 @@ class FileFetcher:
         os.makedirs(temp_dir, exist_ok=True)
 
         temp_file_dir_list = []
+        file_context = {}
 
         # List all files in the folder
         all_files = FileFetcher.local_file(src_folder=src_folder)
         logger.info(f'Total files in the local folder: {len(all_files)}')
 
+        # Statements already loaded (same content hash) are left in place and skipped
+        content_hashes = {}
+        file_digests = {}
+        if all_files:
+            # Size, MD5 & secondary digest of every file in one read, on a thread pool
+            file_digests = DataIntegrityChecker(all_files).digest_files()
+            content_hashes = {file: digest['md5'] if digest else None for file, digest in file_digests.items()}
+            if DBConstants.SKIP_INGESTED_FILES:
+                loaded_hashes = IngestionLedger().get_loaded_hashes(content_hashes.values())
+                skipped = [file for file in all_files if content_hashes[file] in loaded_hashes]
+                if skipped:
+                    logger.info(f'Skipping {len(skipped)} already ingested files: {json.dumps(get_file_nm_list(skipped))}')
+                    all_files = [file for file in all_files if content_hashes[file] not in loaded_hashes]
+
         # Download the first file if available
         if all_files:
             for file in all_files:
@@ -49,6 +66,8 @@ class FileFetcher:
                 shutil.move(file, destination_path)
                 
                 temp_file_dir_list.append(destination_path)
+                file_context[destination_path] = {'name': file_nm, 'source': 'local', 'content_hash': content_hashes.get(file),
+                                                  'secondary_digest': (file_digests.get(file) or {}).get('secondary_digest')}
 
         logger.info(f"Total no of Files Downloaded to `{ConstantRetriever.TEMP_DOWNLOAD_DIR}` Location: {len(temp_file_dir_list)}")
 
@@ -60,12 +79,14 @@ class FileFetcher:
             unlocked_pdfs, _ = unlocker.process_all_unlocked_files(passwords_source='./inputs/passwords.yaml',
                                                                         passwords_key='passwords')
             logger.debug(f'No of files unlocked : `{len(unlocked_pdfs)}`')
+            for pdf_path, password in unlocker.passwords.items():
+                file_context.setdefault(pdf_path, {})['password'] = password
             logger.debug(f'Unlocked files : {get_file_nm_list(unlocked_pdfs)}')
             
             file_to_process = unlocked_pdfs
 
             file_nm_to_process = get_file_nm_list(file_to_process)
             
-            return temp_dir, file_nm_to_process, file_to_process
+            return temp_dir, file_nm_to_process, file_to_process, file_context
         else:
             logger.error(f'No files found in Source location: {src_folder}')
\ No newline at end of file
@@ -0,0 +1,69 @@
+import os
+import sqlite3
+from typing import Dict, Iterable
+from src.components.logfactory import get_logger
+from constants import DataParserConstants
+
+logger = get_logger(__name__)
+
+class CategorizationCache:
+    """
+    Persistent narration -> subcategory cache shared across runs.
+
+    Every entry was computed for a given categorizer `fingerprint` (keyword file, spellcheck mode,
+    stopword constants and NLTK corpora, see `DataTransformation.get_fingerprint`).
+    When the fingerprint changes, the whole cache is invalidated.
+    """
+
+    def __init__(self, fingerprint: str, db_path=DataParserConstants.CATEGORIZATION_CACHE_PATH):
+        self.db_path = db_path
+        self.fingerprint = fingerprint
+        self._entries = None
+        self._ensure_cache_tables_exist()
+
+    def _connect(self):
+        # Worker processes may write concurrently, so wait for the lock instead of failing
+        return sqlite3.connect(self.db_path, timeout=30)
+
+    def _ensure_cache_tables_exist(self):
+        try:
+            os.makedirs(os.path.dirname(self.db_path), exist_ok=True)
+            with self._connect() as conn:
+                conn.execute("CREATE TABLE IF NOT EXISTS CACHE_METADATA (key TEXT PRIMARY KEY, value TEXT);")
+                conn.execute("CREATE TABLE IF NOT EXISTS PARTICULAR_CACHE (narration_key TEXT PRIMARY KEY, subcategory TEXT);")
+
+                row = conn.execute("SELECT value FROM CACHE_METADATA WHERE key = 'fingerprint'").fetchone()
+                if row is None or row[0] != self.fingerprint:
+                    if row is not None:
+                        logger.info(f'Categorizer inputs changed, invalidating Categorization cache')
+                    conn.execute("DELETE FROM PARTICULAR_CACHE;")
+                    conn.execute("INSERT OR REPLACE INTO CACHE_METADATA (key, value) VALUES ('fingerprint', ?)", (self.fingerprint,))
+        except Exception as e:
+            logger.error(f'Error while setting up Categorization cache `{self.db_path}`: {e}')
+
+    def get_many(self, keys: Iterable[str]) -> Dict[str, str]:
+        """ Returns the cached subcategory of every key found in the cache """
+        if self._entries is None:
+            try:
+                with self._connect() as conn:
+                    self._entries = dict(conn.execute("SELECT narration_key, subcategory FROM PARTICULAR_CACHE"))
+            except Exception as e:
+                logger.error(f'Error while reading Categorization cache: {e}')
+                self._entries = {}
+
+        return {key: self._entries[key] for key in keys if key in self._entries}
+
+    def put_many(self, results: Dict[str, str]):
+        """ Stores newly computed narration -> subcategory results """
+        if not results:
+            return
+        try:
+            with self._connect() as conn:
+                conn.executemany(
+                    "INSERT OR REPLACE INTO PARTICULAR_CACHE (narration_key, subcategory) VALUES (?, ?)",
+                    list(results.items())
+                )
+            if self._entries is not None:
+                self._entries.update(results)
+        except Exception as e:
+            logger.error(f'Error while writing Categorization cache: {e}')
@@ -4,61 +4,15 @@ logger = get_logger(__name__)
 
 
 from src.db_operations.sql_procedure import SQL_Procedure
-from constants import DBConstants
 
 
 def trigger_sql_procedure():
+    """ Full reapply of the `RECATEGORIZATION_RULES` table, to run after the rules changed """
     try:
-        updates = [
-                    ('OFFICE FOOD', '%HUNGERBOX%'),
-                    ('OFFICE FOOD', '%Daalchini%'), 
-                    ('FURLENCO', '%Furlenco%'),
-                    ('SWIGGY', '%swiggy%'),
-                    ('GROCERY', '%grocery%'),
-                    ('NEWSPAPER', '%newspa%'),
-                    ('YULU', '%yulu%'),
-                    ('BIKE', '%MOTOR%')
-                ]
-        
-        updates2 = [
-                    ('Bills', '%Furlenco%'),
-                    ('Restaurant', '%swiggy%'),
-                    ('Grocery', '%grocery%'),
-                    ('Bills', '%newspa%'),
-                    ('Transport', '%yulu%')
-                ]
-        
-        investment = [
-            ('Investment', 'RD'),
-        ]
-
-        # Update Row 1
-        SQL_Procedure.update_rows(
-            db_path=DBConstants.DB_PATH,
-            table_name='TRANSACTION_T',
-            set_column='Subcategory',
-            condition_column='Particulars',
-            updates=updates
-        )
-
-        # Update 2 
-        SQL_Procedure.update_rows(
-            db_path=DBConstants.DB_PATH,
-            table_name='TRANSACTION_T',
-            set_column='Category',
-            condition_column='Particulars',
-            updates=updates2
-        )
+        SQL_Procedure.trigger_sql_procedure(load_batch_ids=None)
+    except Exception as e:
+        logger.error(f'Error Occured as : {e}')
 
-        # Investment Update RD 
-        SQL_Procedure.update_rows(
-            db_path=DBConstants.DB_PATH,
-            table_name='TRANSACTION_T',
-            set_column='Category',
-            condition_column='Subcategory',
-            updates=investment
-        )
 
-        logger.info(f'Updated Rows `SQL Stored Procedure`')
-    except Exception as e:
-        logger.error(f'Error Occured as : {e}')   
\ No newline at end of file
+if __name__ == "__main__":
+    trigger_sql_procedure()
@@ -1,4 +1,8 @@
+import math
+import hashlib
 import pandas as pd
+import sqlite3
+import time
 from sqlalchemy import create_engine
 from sqlalchemy.engine import Engine
 from sqlalchemy import inspect, text
@@ -9,13 +13,17 @@ from datetime import datetime
 from src.components.logfactory import get_logger
 import logging
 from constants import DBConstants
+from typing import Iterable, Union
 
 logger = get_logger(__name__)
 
 class DB_DeltaHandler:
     def __init__(self, db_name: str, metadata_table: str):
+        self.db_name = db_name
         self.engine: Engine = create_engine(f"sqlite:///{db_name}")
         self.metadata_table = metadata_table
+        self._migrated_tables = set()
+        self.last_load_batch_id = None
         self._ensure_metadata_table_exists()
 
     def _ensure_metadata_table_exists(self):
@@ -59,7 +67,8 @@ class DB_DeltaHandler:
     def _ensure_target_table_exists(self, target_table: str, expected_columns: set):
         try:
             if self._table_exists(target_table):
-                self._validate_table_schema(target_table, expected_columns)
+                self.migrate_target_table(target_table)
+                self._validate_table_schema(target_table, expected_columns | DBConstants.TRANSACTION_T_MANAGED_COLS)
                 logger.debug(f"Table '{target_table}' exists and schema is valid.")
             else:
                 logger.debug(f"Table '{target_table}' not found. Creating it...")
@@ -70,11 +79,99 @@ class DB_DeltaHandler:
                 with self.engine.begin() as conn:
                     conn.execute(text(create_sql))
 
+                self.migrate_target_table(target_table)
                 logger.debug(f"Table '{target_table}' created.")
 
         except Exception as e:
             logger.error(str(e))
 
+    @staticmethod
+    def get_row_hash(bank, date, particulars, debit, credit, balance) -> str:
+        """
+        Natural key of a transaction: sha1 over the bank, date, narration and amounts.
+        Values are normalized so a row hashes the same from a DataFrame and from the table.
+        """
+        def normalize_amount(value):
+            if value is None or (isinstance(value, float) and math.isnan(value)):
+                return ''
+            try:
+                return f'{float(value):.2f}'
+            except (TypeError, ValueError):
+                return str(value)
+
+        if date is None or pd.isna(date):
+            date = ''
+        elif hasattr(date, 'isoformat'):
+            date = date.isoformat()
+
+        key = '|'.join([str(bank or ''), str(date), str(particulars or ''),
+                        normalize_amount(debit), normalize_amount(credit), normalize_amount(balance)])
+        return hashlib.sha1(key.encode('utf-8')).hexdigest()
+
+    @staticmethod
+    def new_load_batch_id() -> str:
+        return datetime.now().strftime('%Y%m%d%H%M%S%f')
+
+    def _add_managed_columns(self, df: pd.DataFrame, load_batch_id: str) -> pd.DataFrame:
+        """ Appends the `RowHash` natural key and the `LoadBatchId` of the current load """
+        source = [df[col] for col in DBConstants.ROW_HASH_SOURCE_COLS]
+        return df.assign(**{
+            DBConstants.ROW_HASH_COLUMN: [self.get_row_hash(*values) for values in zip(*source)],
+            DBConstants.LOAD_BATCH_COLUMN: load_batch_id,
+        })
+
+    @staticmethod
+    def _insert_or_ignore(pd_table, conn, keys, data_iter):
+        """ `DataFrame.to_sql` insertion method skipping the rows whose natural key already exists """
+        insert_stmt = text(f"INSERT OR IGNORE INTO {pd_table.name} ({', '.join(keys)}) "
+                           f"VALUES ({', '.join(':' + key for key in keys)})")
+        result = conn.execute(insert_stmt, [dict(zip(keys, row)) for row in data_iter])
+        return result.rowcount
+
+    def _migrate_target_table(self, conn: sqlite3.Connection, target_table: str):
+        """
+        Brings an existing transaction table to the current schema, in place:
+        adds and backfills the `RowHash` natural key, drops the duplicate rows it reveals,
+        adds the `LoadBatchId` column and creates the unique `RowHash`, (Bank, Date)
+        and `LoadBatchId` indexes.
+        """
+        if target_table in self._migrated_tables:
+            return
+
+        actual_columns = {row[1] for row in conn.execute(f"PRAGMA table_info({target_table})")}
+        if DBConstants.ROW_HASH_COLUMN not in actual_columns:
+            logger.info(f"Migrating '{target_table}': adding `{DBConstants.ROW_HASH_COLUMN}` natural key")
+            conn.execute(f"ALTER TABLE {target_table} ADD COLUMN {DBConstants.ROW_HASH_COLUMN} TEXT")
+        if DBConstants.LOAD_BATCH_COLUMN not in actual_columns:
+            logger.info(f"Migrating '{target_table}': adding `{DBConstants.LOAD_BATCH_COLUMN}` column")
+            conn.execute(f"ALTER TABLE {target_table} ADD COLUMN {DBConstants.LOAD_BATCH_COLUMN} TEXT")
+
+        # Backfill set-based through a SQL function, also covers rows written by older loaders
+        conn.create_function("ROW_HASH", len(DBConstants.ROW_HASH_SOURCE_COLS), self.get_row_hash, deterministic=True)
+        backfilled = conn.execute(
+            f"UPDATE {target_table} SET {DBConstants.ROW_HASH_COLUMN} = "
+            f"ROW_HASH({', '.join(DBConstants.ROW_HASH_SOURCE_COLS)}) WHERE {DBConstants.ROW_HASH_COLUMN} IS NULL"
+        ).rowcount
+        if backfilled:
+            removed = conn.execute(
+                f"DELETE FROM {target_table} WHERE rowid NOT IN "
+                f"(SELECT MIN(rowid) FROM {target_table} GROUP BY {DBConstants.ROW_HASH_COLUMN})"
+            ).rowcount
+            logger.info(f"Migrated '{target_table}': {backfilled} rows hashed, {removed} duplicate rows removed")
+
+        for index_sql in DBConstants.INDEX_SQL_TEMPLATES:
+            conn.execute(index_sql.format(table=target_table))
+        self._migrated_tables.add(target_table)
+
+    def migrate_target_table(self, target_table: str):
+        """ Runs `_migrate_target_table` in its own transaction """
+        conn = sqlite3.connect(self.db_name, timeout=30)
+        try:
+            with conn:
+                self._migrate_target_table(conn, target_table)
+        finally:
+            conn.close()
+
     def get_last_loaded_date(self, bank_name: str) -> datetime:
         query = f"""
         SELECT last_loaded_date
@@ -128,7 +225,9 @@ class DB_DeltaHandler:
             else:
                 logger.error(f"Column `{col}` not found in DataFrame. Skipping type reset for this column.")
 
-    def load_delta(self, parsed_df: pd.DataFrame, expected_columns:set, bank_name: str, target_table: str):
+    def load_delta(self, parsed_df: pd.DataFrame, expected_columns:set, bank_name: str, target_table: str, load_batch_id: str = None):
+        # Stays None when nothing is inserted
+        self.last_load_batch_id = None
         if "Date" not in parsed_df.columns:
             raise ValueError("DataFrame must contain `Date` column.")
 
@@ -168,18 +267,215 @@ class DB_DeltaHandler:
 
         # Step 3: Insert into SQL
         try:
-            parsed_df.to_sql(target_table, self.engine, if_exists="append", index=False)
+            self.last_load_batch_id = load_batch_id or self.new_load_batch_id()
+            parsed_df = self._add_managed_columns(parsed_df, self.last_load_batch_id)
+            inserted = parsed_df.to_sql(target_table, self.engine, if_exists="append", index=False, method=self._insert_or_ignore)
             new_last_date = parsed_df["Date"].max()
 
             # Updating the Last Date of Inserted data to `MetaData Table`
             self.update_last_loaded_date(bank_name, new_last_date)
-            logger.info(f"Inserted {len(parsed_df)} new records for `{bank_name}` up to {new_last_date}.")
+            logger.info(f"Inserted {inserted} new records for `{bank_name}` up to {new_last_date} "
+                        f"({len(parsed_df) - inserted} already present).")
+            return 1
+        except IntegrityError as e:
+            logger.error(f"IntegrityError: {e.orig}")
+            logger.error("Some records may already exist or violate schema constraints.")
+            return 0
+
+    def load_delta_batches(self, batches: Iterable[pd.DataFrame], expected_columns: set, bank_name: str, target_table: str,
+                           load_batch_id: str = None):
+        """
+        Streaming variant of `load_delta`. Applies the same delta logic while the batches
+        are still being produced: the last-date window is deleted once, every batch is filtered
+        and appended as it arrives, and the metadata is updated at the end.
+        Everything runs in a single transaction so a failed stream leaves the table untouched.
+        """
+        self.last_load_batch_id = load_batch_id or self.new_load_batch_id()
+
+        # Step 1: Ensure target table exists
+        self._ensure_target_table_exists(target_table, expected_columns)
+
+        # Step 2: Filter based on metadata
+        logger.debug(f'Getting Last Load Date for `{bank_name}`')
+        last_date = self.get_last_loaded_date(bank_name)
+        if last_date is None or pd.isna(last_date):
+            logger.warning("Last date is None or NaT — skipping delta load.")
+            last_date = None
+        else:
+            last_date = pd.Timestamp(last_date).date()
+
+        inserted_records = 0
+        new_last_date = None
+        try:
+            with self.engine.begin() as conn:
+                if last_date is not None:
+                    # Delete existing records for last date
+                    logger.info(f'Deleting the existing records for last date')
+                    delete_stmt = text(f"DELETE FROM {target_table} WHERE Date = :last_date AND Bank = :bank_name")
+                    conn.execute(delete_stmt, {"last_date": last_date, "bank_name": bank_name})
+
+                # Step 3: Insert every batch as soon as it arrives
+                for batch_df in batches:
+                    if "Date" not in batch_df.columns:
+                        raise ValueError("DataFrame must contain `Date` column.")
+
+                    batch_df = batch_df[list(expected_columns)].copy()
+                    self.__reset_datatype__(batch_df)
+                    if last_date is not None:
+                        batch_df = batch_df[batch_df["Date"] >= last_date]
+                    if batch_df.empty:
+                        continue
+
+                    batch_df = self._add_managed_columns(batch_df, self.last_load_batch_id)
+                    inserted_records += batch_df.to_sql(target_table, conn, if_exists="append", index=False,
+                                                        method=self._insert_or_ignore)
+                    batch_last_date = batch_df["Date"].max()
+                    new_last_date = batch_last_date if new_last_date is None else max(new_last_date, batch_last_date)
+                    logger.debug(f'Inserted batch of {len(batch_df)} records for `{bank_name}`')
+
+            if inserted_records == 0:
+                logger.info(f"No new records to insert for `{bank_name}`.")
+                return 1
+
+            # Updating the Last Date of Inserted data to `MetaData Table`
+            self.update_last_loaded_date(bank_name, new_last_date)
+            logger.info(f"Inserted {inserted_records} new records for `{bank_name}` up to {new_last_date}.")
             return 1
         except IntegrityError as e:
             logger.error(f"IntegrityError: {e.orig}")
             logger.error("Some records may already exist or violate schema constraints.")
             return 0
 
+    def _connect_bulk(self) -> sqlite3.Connection:
+        """ Raw SQLite connection with the bulk load pragmas applied; transactions are managed explicitly """
+        conn = sqlite3.connect(self.db_name, timeout=30, isolation_level=None)
+        for pragma in DBConstants.BULK_LOAD_PRAGMAS:
+            conn.execute(pragma)
+        return conn
+
+    def _ensure_target_table_exists_bulk(self, conn: sqlite3.Connection, target_table: str, expected_columns: set):
+        """ Same as `_ensure_target_table_exists`, on the bulk connection and without SQLAlchemy reflection """
+        if not conn.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = ?", (target_table,)).fetchone():
+            logger.debug(f"Table '{target_table}' not found. Creating it...")
+            conn.execute(DBConstants.CREATE_SQL_TEMPLATE.format(table=target_table))
+
+        self._migrate_target_table(conn, target_table)
+        actual_columns = {row[1] for row in conn.execute(f"PRAGMA table_info({target_table})")}
+        expected_columns = expected_columns | DBConstants.TRANSACTION_T_MANAGED_COLS
+        missing = expected_columns - actual_columns
+        extra = actual_columns - expected_columns
+        if missing:
+            raise ValueError(f"Table '{target_table}' is missing columns: {missing}")
+        if extra:
+            raise ValueError(f"Table '{target_table}' has unexpected columns: {extra}")
+
+    @staticmethod
+    def _to_sqlite_rows(df: pd.DataFrame) -> list:
+        """ DataFrame -> list of tuples of plain python values (dates as ISO strings, NaN/NaT as NULL) """
+        df = df.astype(object).where(df.notna(), None)
+        if "Date" in df.columns:
+            df["Date"] = df["Date"].map(lambda d: d.isoformat() if hasattr(d, "isoformat") else d)
+        return list(df.itertuples(index=False, name=None))
+
+    def load_delta_bulk(self, data: Union[pd.DataFrame, Iterable[pd.DataFrame]], expected_columns: set, bank_name: str, target_table: str,
+                        load_batch_id: str = None):
+        """
+        Bulk variant of `load_delta` (also accepts the DataFrame batches of the streaming mode).
+
+        The delete of the last-date window, the inserts (`executemany` on one prepared statement)
+        and the `LOAD_STATS_METADATA` upsert run in a single transaction on a raw SQLite connection
+        with tuned pragmas, without SQLAlchemy reflection or per-step transactions.
+        Batches are cleaned, hashed and converted to rows before the write lock is taken, so a
+        statement still being parsed never keeps the database locked.
+        """
+        batches = [data] if isinstance(data, pd.DataFrame) else data
+        columns = list(expected_columns)
+        insert_columns = columns + [DBConstants.ROW_HASH_COLUMN, DBConstants.LOAD_BATCH_COLUMN]
+        date_idx = insert_columns.index("Date")
+        self.last_load_batch_id = load_batch_id or self.new_load_batch_id()
+        insert_sql = f"INSERT OR IGNORE INTO {target_table} ({', '.join(insert_columns)}) VALUES ({', '.join('?' * len(insert_columns))})"
+        upsert_sql = f"""
+            INSERT INTO {self.metadata_table} (bank_name, last_loaded_date)
+            VALUES (?, ?)
+            ON CONFLICT(bank_name) DO UPDATE SET last_loaded_date = excluded.last_loaded_date;
+        """
+
+        start_time = time.perf_counter()
+        processed_records = 0
+        inserted_records = 0
+        new_last_date = None
+
+        # Step 0: Prepare the rows of every batch outside the transaction (batches may still be parsed)
+        try:
+            batch_rows = []
+            for batch_df in batches:
+                if "Date" not in batch_df.columns:
+                    raise ValueError("DataFrame must contain `Date` column.")
+                batch_df = batch_df[columns].copy()
+                self.__reset_datatype__(batch_df)
+                if not batch_df.empty:
+                    batch_rows.append(self._to_sqlite_rows(self._add_managed_columns(batch_df, self.last_load_batch_id)))
+        except Exception as e:
+            logger.error(f"Bulk load failed for `{bank_name}` while preparing the batches: {e}")
+            return 0
+
+        conn = self._connect_bulk()
+        try:
+            conn.execute("BEGIN IMMEDIATE")
+
+            # Step 1: Ensure target table exists
+            self._ensure_target_table_exists_bulk(conn, target_table, expected_columns)
+
+            # Step 2: Filter based on metadata
+            row = conn.execute(f"SELECT last_loaded_date FROM {self.metadata_table} WHERE bank_name = ?", (bank_name,)).fetchone()
+            last_date = pd.Timestamp(row[0]).date() if row and row[0] else None
+            if last_date is None:
+                logger.warning("Last date is None or NaT — skipping delta load.")
+            else:
+                logger.info(f'Deleting the existing records for last date')
+                conn.execute(f"DELETE FROM {target_table} WHERE Date = ? AND Bank = ?", (last_date.isoformat(), bank_name))
+
+            # Step 3: Insert every batch with the same prepared statement (dates are ISO strings, so they compare as dates)
+            for rows in batch_rows:
+                if last_date is not None:
+                    rows = [row for row in rows if row[date_idx] is not None and row[date_idx] >= last_date.isoformat()]
+                if not rows:
+                    continue
+
+                # Rows already present (same natural key) are skipped by `INSERT OR IGNORE`
+                cursor = conn.executemany(insert_sql, rows)
+                processed_records += len(rows)
+                inserted_records += cursor.rowcount
+                batch_last_date = max((row[date_idx] for row in rows if row[date_idx] is not None), default=None)
+                if batch_last_date is not None:
+                    new_last_date = batch_last_date if new_last_date is None else max(new_last_date, batch_last_date)
+
+            # Step 4: Updating the Last Date of Inserted data to `MetaData Table`
+            if processed_records and new_last_date is not None:
+                conn.execute(upsert_sql, (bank_name, new_last_date))
+
+            conn.execute("COMMIT")
+        except Exception as e:
+            if conn.in_transaction:
+                conn.execute("ROLLBACK")
+            logger.error(f"Bulk load failed for `{bank_name}`, transaction rolled back: {e}")
+            return 0
+        finally:
+            conn.close()
+
+        elapsed = time.perf_counter() - start_time
+        if processed_records == 0:
+            logger.info(f"No new records to insert for `{bank_name}`.")
+            return 1
+
+        rows_per_sec = processed_records / elapsed if elapsed > 0 else float('inf')
+        logger.info(f"Inserted {inserted_records} new records for `{bank_name}` up to {new_last_date} "
+                    f"({processed_records - inserted_records} already present) "
+                    f"in {elapsed:.3f}s ({rows_per_sec:,.0f} rows/sec).")
+        if processed_records >= DBConstants.BULK_LOAD_MIN_ROWS_FOR_TARGET and rows_per_sec < DBConstants.BULK_LOAD_TARGET_ROWS_PER_SEC:
+            logger.warning(f"Bulk load below target of {DBConstants.BULK_LOAD_TARGET_ROWS_PER_SEC:,} rows/sec")
+        return 1
+
     def load_delta_gsheet(self, parsed_df: pd.DataFrame, expected_columns: set, bank_name: str, sheet_id: str, gsheet_client: gspread.Client):
         if "Date" not in parsed_df.columns:
             raise ValueError("DataFrame must contain `Date` column.")
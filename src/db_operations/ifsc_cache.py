@@ -0,0 +1,142 @@
+import os
+import csv
+import sqlite3
+import argparse
+from datetime import datetime, timedelta, timezone
+from src.components.logfactory import get_logger
+from constants import IFSCConstants
+
+logger = get_logger(__name__)
+
+class IFSCCache:
+    """
+    Persistent IFSC -> Bank name cache stored in a SQLite file next to the Database.
+
+    Lookups are served from a process-wide dictionary first, then from the SQLite file.
+    The first 4 characters of an IFSC identify the bank, so an unknown branch of an
+    already known bank is also resolved without calling the IFSC API.
+    """
+
+    # Process-wide memo shared by every instance: {ifsc: bank_name}
+    _memory = {}
+
+    def __init__(self, db_path=IFSCConstants.CACHE_DB_PATH, ttl_days=IFSCConstants.CACHE_TTL_DAYS):
+        self.db_path = db_path
+        self.ttl_days = ttl_days
+        self.table = IFSCConstants.CACHE_TABLE
+        self._ensure_cache_table_exists()
+
+    def _ensure_cache_table_exists(self):
+        try:
+            os.makedirs(os.path.dirname(self.db_path), exist_ok=True)
+            with sqlite3.connect(self.db_path) as conn:
+                conn.execute(f"""
+                    CREATE TABLE IF NOT EXISTS {self.table} (
+                        ifsc TEXT PRIMARY KEY,
+                        bank_code TEXT NOT NULL,
+                        bank_name TEXT NOT NULL,
+                        source TEXT,
+                        fetched_at TEXT NOT NULL
+                    );
+                """)
+                conn.execute(f"CREATE INDEX IF NOT EXISTS IDX_{self.table}_BANK_CODE ON {self.table} (bank_code);")
+        except Exception as e:
+            logger.error(f'Error while setting up IFSC cache `{self.db_path}`: {e}')
+
+    @staticmethod
+    def _now():
+        return datetime.now(timezone.utc)
+
+    def _ttl_cutoff(self) -> str:
+        return (self._now() - timedelta(days=self.ttl_days)).isoformat()
+
+    def get_bank_name(self, ifsc_code: str):
+        """
+        Returns the cached bank name for the IFSC code or None if it is not cached / expired.
+        """
+        if not ifsc_code:
+            return None
+
+        ifsc_code = ifsc_code.upper()
+        if ifsc_code in self._memory:
+            return self._memory[ifsc_code]
+
+        try:
+            with sqlite3.connect(self.db_path) as conn:
+                row = conn.execute(
+                    f"SELECT bank_name FROM {self.table} WHERE ifsc = ? AND fetched_at >= ?",
+                    (ifsc_code, self._ttl_cutoff())
+                ).fetchone()
+
+                # Any branch of the same bank resolves to the same bank name
+                if row is None:
+                    row = conn.execute(
+                        f"SELECT bank_name FROM {self.table} WHERE bank_code = ? AND fetched_at >= ? LIMIT 1",
+                        (ifsc_code[:4], self._ttl_cutoff())
+                    ).fetchone()
+        except Exception as e:
+            logger.error(f'Error while reading IFSC cache: {e}')
+            return None
+
+        if row is None:
+            return None
+
+        self._memory[ifsc_code] = row[0]
+        logger.debug(f'IFSC `{ifsc_code}` resolved from cache: {row[0]}')
+        return row[0]
+
+    def put(self, ifsc_code: str, bank_name: str, source: str = 'api'):
+        """ Stores (or refreshes) a single IFSC -> Bank name entry """
+        if not ifsc_code or not bank_name:
+            return
+
+        ifsc_code = ifsc_code.upper()
+        self._memory[ifsc_code] = bank_name
+        try:
+            with sqlite3.connect(self.db_path) as conn:
+                conn.execute(
+                    f"INSERT OR REPLACE INTO {self.table} (ifsc, bank_code, bank_name, source, fetched_at) VALUES (?, ?, ?, ?, ?)",
+                    (ifsc_code, ifsc_code[:4], bank_name, source, self._now().isoformat())
+                )
+        except Exception as e:
+            logger.error(f'Error while writing IFSC cache: {e}')
+
+    def preload_from_dump(self, dump_path=IFSCConstants.LOCAL_DUMP_PATH) -> int:
+        """
+        Bulk loads a local IFSC dump (CSV with `IFSC` and `BANK` columns) into the cache
+        in a single transaction.
+
+        Returns:
+            int: Number of IFSC entries loaded.
+        """
+        if not os.path.exists(dump_path):
+            logger.error(f'IFSC dump not found at `{dump_path}`')
+            return 0
+
+        fetched_at = self._now().isoformat()
+        try:
+            with open(dump_path, 'r', newline='', encoding='utf-8') as f:
+                rows = [
+                    (row['IFSC'].strip().upper(), row['IFSC'].strip().upper()[:4], row['BANK'].strip(), 'dump', fetched_at)
+                    for row in csv.DictReader(f)
+                    if row.get('IFSC') and row.get('BANK')
+                ]
+
+            with sqlite3.connect(self.db_path) as conn:
+                conn.executemany(
+                    f"INSERT OR REPLACE INTO {self.table} (ifsc, bank_code, bank_name, source, fetched_at) VALUES (?, ?, ?, ?, ?)",
+                    rows
+                )
+            logger.info(f'Preloaded {len(rows)} IFSC entries from `{dump_path}`')
+            return len(rows)
+        except Exception as e:
+            logger.error(f'Error while preloading IFSC dump `{dump_path}`: {e}')
+            return 0
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Preload the IFSC cache from a local IFSC dump")
+    parser.add_argument('--dump', type=str, default=str(IFSCConstants.LOCAL_DUMP_PATH), help='Path to IFSC dump CSV')
+    args = parser.parse_args()
+
+    IFSCCache().preload_from_dump(dump_path=args.dump)
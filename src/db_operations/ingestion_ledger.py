@@ -0,0 +1,104 @@
+import os
+import sqlite3
+from datetime import datetime
+from typing import Iterable, Set
+from src.components.logfactory import get_logger
+from constants import DBConstants
+
+logger = get_logger(__name__)
+
+class IngestionLedger:
+    """
+    Persistent ledger of the ingested statements, keyed by the content hash (MD5) of the file.
+
+    Every processed file is recorded with its bank, statement period, row count, status
+    (`LOADED` / `FAILED`) and, when computed, a secondary digest (`IntegrityConstants.SECONDARY_DIGEST`).
+    Files whose hash is already `LOADED` are skipped by the pull stages before any download,
+    decryption or parsing.
+    """
+
+    STATUS_LOADED = 'LOADED'
+    STATUS_FAILED = 'FAILED'
+
+    def __init__(self, db_path=DBConstants.DB_PATH, table=DBConstants.INGESTION_LEDGER_TABLE):
+        self.db_path = db_path
+        self.table = table
+        self._ensure_ledger_table_exists()
+
+    def _connect(self):
+        return sqlite3.connect(self.db_path, timeout=30)
+
+    def _ensure_ledger_table_exists(self):
+        try:
+            os.makedirs(os.path.dirname(self.db_path), exist_ok=True)
+            with self._connect() as conn:
+                conn.execute(f"""
+                    CREATE TABLE IF NOT EXISTS {self.table} (
+                        content_hash TEXT PRIMARY KEY,
+                        file_name TEXT,
+                        source TEXT,
+                        bank TEXT,
+                        period_start DATE,
+                        period_end DATE,
+                        row_count INTEGER,
+                        status TEXT NOT NULL,
+                        updated_at TEXT NOT NULL,
+                        secondary_digest TEXT
+                    );
+                    """)
+                # Ledgers created before the secondary digest was recorded
+                columns = {row[1] for row in conn.execute(f"PRAGMA table_info({self.table})")}
+                if 'secondary_digest' not in columns:
+                    conn.execute(f"ALTER TABLE {self.table} ADD COLUMN secondary_digest TEXT")
+        except Exception as e:
+            logger.error(f'Error while setting up Ingestion ledger `{self.table}`: {e}')
+
+    def get_loaded_hashes(self, content_hashes: Iterable[str]) -> Set[str]:
+        """ Subset of `content_hashes` already loaded successfully """
+        content_hashes = [content_hash for content_hash in content_hashes if content_hash]
+        if not content_hashes:
+            return set()
+        try:
+            with self._connect() as conn:
+                loaded = set()
+                # Chunked to stay under the SQLite host parameter limit
+                for start in range(0, len(content_hashes), 500):
+                    chunk = content_hashes[start:start + 500]
+                    rows = conn.execute(
+                        f"SELECT content_hash FROM {self.table} WHERE status = ? "
+                        f"AND content_hash IN ({', '.join('?' * len(chunk))})",
+                        [self.STATUS_LOADED] + chunk
+                    )
+                    loaded.update(row[0] for row in rows)
+                return loaded
+        except Exception as e:
+            logger.error(f'Error while reading Ingestion ledger: {e}')
+            return set()
+
+    def record(self, content_hash: str, file_name: str, status: str, source: str = None, bank: str = None,
+               period_start=None, period_end=None, row_count: int = None, secondary_digest: str = None):
+        """ Inserts or updates the ledger entry of a file """
+        if not content_hash:
+            return
+        try:
+            with self._connect() as conn:
+                conn.execute(
+                    f"""
+                    INSERT INTO {self.table}
+                        (content_hash, file_name, source, bank, period_start, period_end, row_count, status, updated_at,
+                         secondary_digest)
+                    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+                    ON CONFLICT(content_hash) DO UPDATE SET
+                        file_name = excluded.file_name, source = excluded.source, bank = excluded.bank,
+                        period_start = excluded.period_start, period_end = excluded.period_end,
+                        row_count = excluded.row_count, status = excluded.status, updated_at = excluded.updated_at,
+                        secondary_digest = COALESCE(excluded.secondary_digest, secondary_digest);
+                    """,
+                    (content_hash, file_name, source, bank,
+                     str(period_start) if period_start is not None else None,
+                     str(period_end) if period_end is not None else None,
+                     row_count, status, datetime.now().isoformat(timespec='seconds'), secondary_digest)
+                )
+            logger.debug(f'Ingestion ledger: `{file_name}` recorded as {status}')
+        except Exception as e:
+            logger.error(f'Error while writing Ingestion ledger for `{file_name}`: {e}')
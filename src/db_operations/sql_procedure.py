@@ -41,62 +41,125 @@ class SQL_Procedure:
             return -1  # Failure
         
     @classmethod
-    
-    ## List of action and wildcard are passed to identify the pattern and replace.
-    ## [ ('<column_to_change>'), ('<condition>')...]
-    def trigger_sql_procedure(cls):
-        try:
-            updates = [
-                        ('OFFICE FOOD', '%HUNGERBOX%'),
-                        ('OFFICE FOOD', '%Daalchini%'), 
-                        ('FURLENCO', '%Furlenco%'),
-                        ('SWIGGY', '%swiggy%'),
-                        ('GROCERY', '%grocery%'),
-                        ('NEWSPAPER', '%newspa%'),
-                        ('YULU', '%yulu%'),
-                        ('BIKE', '%MOTOR%')
-                    ]
-            
-            updates2 = [
-                        ('Bills', '%Furlenco%'),
-                        ('Restaurant', '%swiggy%'),
-                        ('Grocery', '%grocery%'),
-                        ('Bills', '%newspa%'),
-                        ('Transport', '%yulu%')
-                    ]
-            
-            investment = [
-                ('Investment', 'RD'),
-            ]
-
-            # Update Row 1
-            SQL_Procedure.update_rows(
-                db_path=DBConstants.DB_PATH,
-                table_name='TRANSACTION_T',
-                set_column='Subcategory',
-                condition_column='Particulars',
-                updates=updates
+    def ensure_rules_table(cls, conn: sqlite3.Connection, rules_table: str = DBConstants.RULES_TABLE):
+        """ Creates the recategorization rules table and seeds it from `DBConstants.RECATEGORIZATION_RULES` when empty """
+        conn.execute(f"""
+            CREATE TABLE IF NOT EXISTS {rules_table} (
+                rule_order INTEGER PRIMARY KEY,
+                set_column TEXT NOT NULL,
+                condition_column TEXT NOT NULL,
+                pattern TEXT NOT NULL,
+                new_value TEXT
+            );
+            """)
+        if conn.execute(f"SELECT 1 FROM {rules_table} LIMIT 1").fetchone() is None:
+            conn.executemany(
+                f"INSERT INTO {rules_table} (rule_order, set_column, condition_column, pattern, new_value) VALUES (?, ?, ?, ?, ?)",
+                DBConstants.RECATEGORIZATION_RULES
             )
+            logger.info(f'Seeded `{rules_table}` with {len(DBConstants.RECATEGORIZATION_RULES)} rules')
 
-            # Update 2 
-            SQL_Procedure.update_rows(
-                db_path=DBConstants.DB_PATH,
-                table_name='TRANSACTION_T',
-                set_column='Category',
-                condition_column='Particulars',
-                updates=updates2
-            )
+    @classmethod
+    def ensure_recategorized_table(cls, conn: sqlite3.Connection,
+                                   recategorized_table: str = DBConstants.RECATEGORIZED_BATCHES_TABLE):
+        """ Creates the table of the load batches the rules were already applied to """
+        conn.execute(f"""
+            CREATE TABLE IF NOT EXISTS {recategorized_table} (
+                load_batch_id TEXT PRIMARY KEY,
+                recategorized_at TEXT NOT NULL DEFAULT CURRENT_TIMESTAMP
+            );
+            """)
+
+    @classmethod
+    def get_pending_load_batch_ids(cls, conn: sqlite3.Connection, table_name: str = DBConstants.TRANSACTION_TABLE,
+                                   recategorized_table: str = DBConstants.RECATEGORIZED_BATCHES_TABLE) -> list:
+        """ Load batches of `table_name` the rules were never applied to (including loads of crashed runs) """
+        if conn.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = ?", (table_name,)).fetchone() is None:
+            return []
+        batch_column = DBConstants.LOAD_BATCH_COLUMN
+        rows = conn.execute(f"""
+            SELECT DISTINCT t.{batch_column} FROM {table_name} t
+            WHERE t.{batch_column} IS NOT NULL
+              AND NOT EXISTS (SELECT 1 FROM {recategorized_table} r WHERE r.load_batch_id = t.{batch_column})
+            """).fetchall()
+        return [row[0] for row in rows]
+
+    @classmethod
+    def apply_rules(cls, db_path=DBConstants.DB_PATH, table_name=DBConstants.TRANSACTION_TABLE,
+                    rules_table=DBConstants.RULES_TABLE, load_batch_ids: list = None, pending_only: bool = False) -> dict:
+        """
+        Applies the rules table to `table_name` with one set-based UPDATE per target column.
+
+        Every row takes the `new_value` of the last matching rule (highest `rule_order`), the same
+        outcome as running the rules one after the other. The `Subcategory` pass runs first, so the
+        `Category` rules conditioned on `Subcategory` see the updated values.
+
+        The updated load batches are recorded in `RECATEGORIZED_BATCHES_TABLE` in the same transaction.
+
+        Parameters:
+            load_batch_ids (list): Only rows inserted by these loads are updated; None reapplies
+                the rules to the whole table (e.g. after the rules changed).
+            pending_only (bool): Only rows of the load batches not recategorized yet are updated,
+                whichever run loaded them (overrides `load_batch_ids`).
+
+        Returns:
+            dict of updated row count per target column.
+        """
+        # Column the rule condition is evaluated on, picked per rule
+        condition_value = "CASE r.condition_column " + " ".join(
+            f"WHEN '{col}' THEN t.{col}" for col in DBConstants.RULE_CONDITION_COLS
+        ) + " END"
+
+        rowcounts = {}
+        with sqlite3.connect(db_path, timeout=30) as conn:
+            cls.ensure_rules_table(conn, rules_table)
+            cls.ensure_recategorized_table(conn)
+
+            if pending_only:
+                load_batch_ids = cls.get_pending_load_batch_ids(conn, table_name)
+
+            batch_filter, params = "", []
+            if load_batch_ids is not None:
+                if not load_batch_ids:
+                    return {}
+                batch_filter = f"t.{DBConstants.LOAD_BATCH_COLUMN} IN ({', '.join('?' * len(load_batch_ids))}) AND "
+                params = list(load_batch_ids)
 
-            # Investment Update RD 
-            SQL_Procedure.update_rows(
-                db_path=DBConstants.DB_PATH,
-                table_name='TRANSACTION_T',
-                set_column='Category',
-                condition_column='Subcategory',
-                updates=investment
+            for set_column in DBConstants.RECATEGORIZATION_PASSES:
+                matching_rules = f"""
+                    FROM {rules_table} r
+                    WHERE r.set_column = '{set_column}' AND {condition_value} LIKE r.pattern
+                """
+                query = f"""
+                UPDATE {table_name} AS t
+                SET {set_column} = (SELECT r.new_value {matching_rules} ORDER BY r.rule_order DESC LIMIT 1)
+                WHERE {batch_filter}EXISTS (SELECT 1 {matching_rules})
+                """
+                rowcounts[set_column] = conn.execute(query, params).rowcount
+
+            if load_batch_ids is None:
+                load_batch_ids = cls.get_pending_load_batch_ids(conn, table_name)
+            conn.executemany(
+                f"INSERT OR IGNORE INTO {DBConstants.RECATEGORIZED_BATCHES_TABLE} (load_batch_id) VALUES (?)",
+                [(load_batch_id,) for load_batch_id in load_batch_ids]
             )
 
-            logger.info(f'Updated Rows `SQL Stored Procedure`')
+        return rowcounts
+
+    @classmethod
+    def trigger_sql_procedure(cls, load_batch_ids: list = None, pending_only: bool = False):
+        """
+        Recategorizes the rows of the given loads (all the rows when `load_batch_ids` is None),
+        or of every load not recategorized yet with `pending_only`
+        """
+        try:
+            rowcounts = SQL_Procedure.apply_rules(load_batch_ids=load_batch_ids, pending_only=pending_only)
+            if pending_only:
+                scope = 'pending load batches'
+            else:
+                scope = 'all rows' if load_batch_ids is None else f'load batches {load_batch_ids}'
+            logger.info(f'Updated Rows `SQL Stored Procedure` on {scope}: {rowcounts}')
+            return rowcounts
 
         except Exception as e:
-            logger.error(f'Error Occured as : {e}')   
+            logger.error(f'Error Occured as : {e}')
@@ -0,0 +1,116 @@
+import os
+import time
+import threading
+import requests
+import httplib2
+import google_auth_httplib2
+from google.auth.transport.requests import Request
+from googleapiclient.discovery import build_from_document
+from googleapiclient.discovery_cache import get_static_doc
+from src.gcs_utils.gcs_connection import GoogleAuthenticator
+from src.components.logfactory import get_logger
+from constants import GoogleAuthConstants, GDriveConstants
+
+logger = get_logger(__name__)
+
+
+class DriveClientPool:
+    """
+    Process wide pool of authenticated Google Drive clients.
+
+    Credentials are loaded (or refreshed) once per profile and the discovery document is
+    read once from an on-disk cache, so getting a client costs a `build_from_document`
+    the first time a thread asks for it and nothing afterwards.
+
+    googleapiclient services are not thread safe: every thread gets its own service
+    handle on its own `AuthorizedHttp`, all sharing the same credentials.
+
+    Profiles:
+        'default' -> token of `GoogleOAuth2Service` (Drive, Gmail and Sheets scopes)
+        'delete'  -> owner token used to delete source files (see `authenticate_for_delete`)
+    """
+
+    _lock = threading.Lock()
+    _credentials = {}
+    _discovery_docs = {}
+    _local = threading.local()
+
+    @classmethod
+    def _authenticate(cls, profile):
+        if profile == 'default':
+            all_scopes = [GoogleAuthConstants.GMAIL_SCOPES,
+                          GoogleAuthConstants.GDRIVE_SCOPES,
+                          GoogleAuthConstants.GSHEET_SCOPES
+                          ]
+            return GoogleAuthenticator(scopes=all_scopes).authenticate()
+        if profile == 'delete':
+            # Imported here, `gdrive_operations` itself uses the pool
+            from src.gcs_utils.gdrive_operations import authenticate_for_delete
+            return authenticate_for_delete()
+        raise ValueError(f'Unknown Drive credential profile: `{profile}`')
+
+    @classmethod
+    def get_credentials(cls, profile='default'):
+        with cls._lock:
+            creds = cls._credentials.get(profile)
+            if creds is None:
+                start_time = time.perf_counter()
+                creds = cls._authenticate(profile)
+                cls._credentials[profile] = creds
+                logger.debug(f'Authenticated Drive profile `{profile}` in {time.perf_counter() - start_time:.2f}s')
+            elif creds.expired and creds.refresh_token:
+                creds.refresh(Request())
+        return creds
+
+    @classmethod
+    def get_discovery_document(cls, service_name=GoogleAuthConstants.GDRIVE_SERVICE_NAME,
+                               version=GoogleAuthConstants.GDRIVE_VERSION):
+        """ Discovery document from memory, then the disk cache, then the bundled or online copy """
+        key = (service_name, version)
+        with cls._lock:
+            if key in cls._discovery_docs:
+                return cls._discovery_docs[key]
+
+            cache_path = os.path.join(GDriveConstants.DISCOVERY_CACHE_DIR, f'{service_name}.{version}.json')
+            max_age = GDriveConstants.DISCOVERY_CACHE_TTL_DAYS * 24 * 3600
+            document = None
+
+            if os.path.exists(cache_path) and time.time() - os.path.getmtime(cache_path) < max_age:
+                with open(cache_path, 'r', encoding='utf-8') as f:
+                    document = f.read()
+            else:
+                document = get_static_doc(service_name, version)
+                if document is None:
+                    url = GDriveConstants.DISCOVERY_URL.format(api=service_name, version=version)
+                    response = requests.get(url, timeout=GDriveConstants.DISCOVERY_TIMEOUT)
+                    response.raise_for_status()
+                    document = response.text
+                try:
+                    os.makedirs(GDriveConstants.DISCOVERY_CACHE_DIR, exist_ok=True)
+                    with open(cache_path, 'w', encoding='utf-8') as f:
+                        f.write(document)
+                except Exception as e:
+                    logger.warning(f'Could not cache discovery document of `{service_name}`: {e}')
+
+            cls._discovery_docs[key] = document
+            return document
+
+    @classmethod
+    def get_service(cls, profile='default'):
+        """ Drive service of the calling thread for `profile`, built on first use """
+        services = getattr(cls._local, 'services', None)
+        if services is None:
+            services = cls._local.services = {}
+
+        if profile not in services:
+            creds = cls.get_credentials(profile)
+            http = google_auth_httplib2.AuthorizedHttp(creds, http=httplib2.Http())
+            services[profile] = build_from_document(cls.get_discovery_document(), http=http)
+        return services[profile]
+
+    @classmethod
+    def reset(cls):
+        """ Drops the cached credentials and the services of the calling thread """
+        with cls._lock:
+            cls._credentials.clear()
+        cls._local.services = {}
@@ -1,43 +1,92 @@
 from googleapiclient.http import MediaIoBaseDownload
 import io
+import os
+import hashlib
+import threading
 from src.components.logfactory import get_logger
+from src.components.utils import parallel_map_thread
+from constants import GDriveConstants
 
 logger = get_logger(__name__)
 
+class HashingWriter:
+    """ File-like sink computing the MD5 and size of the bytes while they are written to `fh` """
+
+    def __init__(self, fh):
+        self.fh = fh
+        self.md5 = hashlib.md5()
+        self.size = 0
+
+    def write(self, data):
+        self.md5.update(data)
+        self.size += len(data)
+        return self.fh.write(data)
+
+    def hexdigest(self):
+        return self.md5.hexdigest()
+
+
 class GoogleDriveFolderManager:
     """
     This class is to manage Google Drive folder operations such as listing and downloading files.
     Initializes the GoogleDriveFolderManager with an authenticated Google Drive service.
         Class Args:   service (googleapiclient.discovery.Resource): Authenticated Google Drive API service.
 
-    Methods : (1) `list_files(folder_id, page_size=10)`
+    Methods : (1) `list_files(folder_id, page_size=GDriveConstants.LIST_PAGE_SIZE, modified_after=None)`
              -------------------------------------------------------------------
                 Lists all files in a specified Google Drive folder, handling pagination to retrieve all files.
                 Args:
                     folder_id (str): The ID of the Google Drive folder to list files from.
-                    page_size (int, optional): Number of files to retrieve per API call (max 1000). Default is 10.
+                    page_size (int, optional): Number of files to retrieve per API call, capped at 1000 (the Drive API max).
+                        Default is `GDriveConstants.LIST_PAGE_SIZE` (1000), so most folders are listed in one call.
+                    modified_after (str, optional): RFC 3339 timestamp (e.g. '2024-01-31T00:00:00Z'); only files whose
+                        modifiedTime or createdTime (uploaded / copied) is after it are listed. Default None lists every file.
                 Returns:
-                    list of dict: A list of file metadata dictionaries, each containing 'id' and 'name' keys.
+                    list of dict: A list of file metadata dictionaries ('id', 'name', 'mimeType',
+                    'md5Checksum', 'size', 'fileExtension', 'modifiedTime', 'createdTime').
              (2) download_pdf_file(file_id, destination_path)
              -------------------------------------------------------------------
                     Downloads a file from Google Drive by its file ID to a local destination path.
                 Args:
                     file_id (str): The ID of the file to download.
                     destination_path (str): The local file path where the downloaded file will be saved.
+             (3) download_files(files, destination_dir, max_workers)
+             -------------------------------------------------------------------
+                    Downloads the listed files concurrently (one Drive client per worker thread).
+
+        `service_factory` (optional) builds a new Drive service; googleapiclient services are
+        not thread safe, so every download thread gets its own. Without it downloads run serially
+        on `service`.
     """
 
-    def __init__(self, service):
+    def __init__(self, service, service_factory=None):
         self.service = service
+        self.service_factory = service_factory
+        self._local = threading.local()
 
-    def list_files(self, folder_id, page_size=10):
+    def _get_service(self):
+        if self.service_factory is None or threading.current_thread() is threading.main_thread():
+            return self.service
+        if not hasattr(self._local, 'service'):
+            self._local.service = self.service_factory()
+        return self._local.service
+
+    def list_files(self, folder_id, page_size=GDriveConstants.LIST_PAGE_SIZE, fields=GDriveConstants.LIST_FILE_FIELDS, modified_after=None):
         files = []
         page_token = None
+        api_calls = 0
+
+        query = f"'{folder_id}' in parents and mimeType != 'application/vnd.google-apps.folder' and trashed = false"
+        if modified_after:
+            # Uploads keep the modifiedTime of the local file, their createdTime is the upload time
+            query += f" and (modifiedTime > '{modified_after}' or createdTime > '{modified_after}')"
 
         while True:
+            api_calls += 1
             response = self.service.files().list(
-                q=f"'{folder_id}' in parents and mimeType != 'application/vnd.google-apps.folder' and trashed = false",
-                pageSize=page_size,
-                fields="nextPageToken, files(id, name, mimeType)",
+                q=query,
+                pageSize=min(page_size, 1000),
+                fields=fields,
                 pageToken=page_token
             ).execute()
 
@@ -53,45 +102,83 @@ class GoogleDriveFolderManager:
             if not page_token:
                 break
 
-        logger.info(f"Total files in FolderID `{folder_id}` :- {len(files)}\n")
+        logger.info(f"Total files in FolderID `{folder_id}` :- {len(files)} ({api_calls} listing calls)\n")
         return files
 
 
-    def file_downloader(self, file_id, destination_path):
-        # First, get the file metadata to check MIME type
+    def file_downloader(self, file_id, destination_path, file_metadata=None):
+        """
+        Downloads a file, computing its MD5 and size while the chunks are written.
+        `file_metadata` from `list_files` avoids an extra metadata call.
 
-        file_metadata = self.service.files().get(fileId=file_id, fields='mimeType, fileExtension, name, size, md5Checksum').execute()
-        
+        Returns:
+            The file metadata with `local_md5Checksum` and `local_size` of the downloaded bytes.
+        """
+        service = self._get_service()
+        if file_metadata is None:
+            file_metadata = service.files().get(fileId=file_id, fields='mimeType, fileExtension, name, size, md5Checksum').execute()
+        file_metadata = dict(file_metadata)
         mime_type = file_metadata.get('mimeType')
-        file_name = file_metadata.get('name')
-        ext = file_metadata.get('fileExtension')
-
-        # Define MIME types for Google Docs Editors files and their export formats
-        google_docs_mime_types = {
-            'application/vnd.google-apps.document': 'application/pdf',  # Google Docs -> PDF
-            'application/vnd.google-apps.spreadsheet': 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet',  # Sheets -> XLSX
-            'application/vnd.google-apps.presentation': 'application/pdf',  # Slides -> PDF
-            # Add more if needed
-        }
-
-        try:
-            if mime_type in google_docs_mime_types:
-                export_mime_type = google_docs_mime_types[mime_type]
-                request = self.service.files().export_media(fileId=file_id, mimeType=export_mime_type)
-            else:
-                request = self.service.files().get_media(fileId=file_id)
-        except Exception as e:
-            logger.error(f"Error creating request for file ID {file_id}: {e}")
-            pass
-
-        # Open local file for writing in binary mode
-        fh = io.FileIO(destination_path, 'wb')
-
-        # Create a downloader object to download the file in chunks
-        downloader = MediaIoBaseDownload(fh, request)
-
-        done = False
-        while not done:
-            status, done = downloader.next_chunk()
 
+        if mime_type in GDriveConstants.GOOGLE_DOCS_EXPORT_MIME_TYPES:
+            export_mime_type = GDriveConstants.GOOGLE_DOCS_EXPORT_MIME_TYPES[mime_type]
+            request = service.files().export_media(fileId=file_id, mimeType=export_mime_type)
+        else:
+            request = service.files().get_media(fileId=file_id)
+
+        # Open local file for writing in binary mode, hashing the chunks on the way
+        with io.FileIO(destination_path, 'wb') as fh:
+            writer = HashingWriter(fh)
+
+            # Create a downloader object to download the file in chunks
+            downloader = MediaIoBaseDownload(writer, request)
+            done = False
+            while not done:
+                status, done = downloader.next_chunk()
+
+        file_metadata['local_md5Checksum'] = writer.hexdigest()
+        file_metadata['local_size'] = writer.size
         return file_metadata
+
+    def download_files(self, files, destination_dir, max_workers=GDriveConstants.DOWNLOAD_CONCURRENCY):
+        """
+        Downloads the listed files into `destination_dir`, up to `max_workers` at a time.
+
+        Drive allows several files with the same name in a folder: every file gets its own
+        destination path (`<name>_<n>.<ext>` for the duplicates, see `local_name`), so two
+        downloads never write to the same file. `name` keeps the Drive name.
+
+        Returns:
+            list of (destination_path, file_metadata) in the order of `files`,
+            files which failed to download are left out.
+        """
+        def download(file_and_path):
+            file, destination_path = file_and_path
+            try:
+                file_metadata = self.file_downloader(file['id'], destination_path, file_metadata=file)
+                file_metadata['local_name'] = os.path.basename(destination_path)
+                return destination_path, file_metadata
+            except Exception as e:
+                logger.error(f"Error while downloading file `{file.get('name')}` (ID {file.get('id')}): {e}")
+                return None
+
+        destination_paths = self.get_destination_paths(files, destination_dir)
+        workers = max_workers if self.service_factory is not None else 1
+        logger.info(f'Downloading {len(files)} files with concurrency {min(workers, max(len(files), 1))}')
+        return [result for result in parallel_map_thread(download, list(zip(files, destination_paths)), max_workers=workers)
+                if result]
+
+    @staticmethod
+    def get_destination_paths(files, destination_dir):
+        """ Local path of every file, duplicated names (case insensitive) get a `_<n>` suffix """
+        used_names = set()
+        destination_paths = []
+        for file in files:
+            stem, extension = os.path.splitext(file['name'])
+            local_name, suffix = file['name'], 1
+            while local_name.lower() in used_names:
+                local_name = f'{stem}_{suffix}{extension}'
+                suffix += 1
+            used_names.add(local_name.lower())
+            destination_paths.append(os.path.join(destination_dir, local_name))
+        return destination_paths
@@ -1,16 +1,64 @@
 import os, sys
 import json
 import logging
-from src.gcs_utils.gcs_connection import GoogleAuthenticator, GoogleOAuth2Service
+from datetime import datetime, timedelta, timezone
+from src.gcs_utils.gcs_connection import GoogleAuthenticator
+from src.gcs_utils.gcs_client_pool import DriveClientPool
 from src.gcs_utils.gcs_operations import GoogleDriveFolderManager
 from src.utils.dq_validation import DataQualityValidation
 from src.components.file_unlocker import PDFUnlocker
 from src.components.logfactory import get_logger
-from constants import ConstantRetriever
+from constants import ConstantRetriever, DBConstants, GDriveConstants
+from src.db_operations.ingestion_ledger import IngestionLedger
 from src.components.utils import get_file_nm_list
 
 logger = get_logger(__name__)
 
+# Folder ID -> pull time, committed by `commit_listing_state` once the pulled files are loaded
+_pending_listing_state = {}
+# Folder ID -> Drive IDs of the listed files skipped as already ingested, removed from the source by the caller
+_ingested_file_ids = {}
+
+def load_listing_state() -> dict:
+    ''' Folder ID -> RFC 3339 time of its last successful pull (incremental listing) '''
+    try:
+        with open(GDriveConstants.LISTING_STATE_PATH, 'r') as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return {}
+    except Exception as e:
+        logger.error(f'Error while reading listing state, doing a full listing: {e}')
+        return {}
+
+def save_listing_state(folder_id, pulled_at: str):
+    state = load_listing_state()
+    state[folder_id] = pulled_at
+    try:
+        os.makedirs(os.path.dirname(GDriveConstants.LISTING_STATE_PATH), exist_ok=True)
+        with open(GDriveConstants.LISTING_STATE_PATH, 'w') as f:
+            json.dump(state, f, indent=4)
+    except Exception as e:
+        logger.error(f'Error while saving listing state: {e}')
+
+def commit_listing_state(folder_id):
+    ''' Moves the incremental listing watermark of `folder_id` to its last pull; to call once every pulled file is loaded '''
+    pulled_at = _pending_listing_state.pop(folder_id, None)
+    if pulled_at:
+        save_listing_state(folder_id, pulled_at)
+        logger.info(f'Incremental listing state of `{folder_id}` moved to {pulled_at}')
+
+def pop_ingested_file_ids(folder_id):
+    ''' Drive IDs of the files of `folder_id` skipped by the last pull as already ingested (see `IngestionLedger`) '''
+    return _ingested_file_ids.pop(folder_id, [])
+
+def get_listing_watermark(folder_id):
+    ''' Listing lower bound of the incremental mode: the last committed pull minus the overlap window '''
+    last_pulled_at = load_listing_state().get(folder_id)
+    if not last_pulled_at:
+        return None
+    watermark = datetime.strptime(last_pulled_at, '%Y-%m-%dT%H:%M:%SZ') - timedelta(hours=GDriveConstants.LISTING_OVERLAP_HOURS)
+    return watermark.strftime('%Y-%m-%dT%H:%M:%SZ')
+
 def pull_gdrive_data(folder_id):
 
     ''' This function orchestrate all the modules of `gcs_utils` 
@@ -19,13 +67,15 @@ def pull_gdrive_data(folder_id):
         3. Validates the downloaded file
         
         Returns: 
-        1. File Names Only (List of Names)
-        2. File Directory TEMP (List of directory)
+        1. TEMP directory
+        2. File Names Only (List of Names)
+        3. File Directory TEMP (List of directory)
+        4. File context: File Directory TEMP -> Drive `id`, `name`, `md5Checksum`, `size`, `modifiedTime`
+           and the `password` of encrypted files (decrypted in memory by the parser)
     '''
-    drive_service, mail_service, _ = GoogleOAuth2Service.initialize_auth_service_built()
-    
-    # Assuming you have an authenticated Google Drive API service object named `service`
-    manager = GoogleDriveFolderManager(drive_service)
+    # Drive clients come from the process wide pool (authenticated once, one client per thread)
+    drive_service = DriveClientPool.get_service()
+    manager = GoogleDriveFolderManager(drive_service, service_factory=DriveClientPool.get_service)
 
     # Creation of persistent temporary directory
     script_base = ConstantRetriever.SCRIPT_BASE
@@ -35,16 +85,44 @@ def pull_gdrive_data(folder_id):
     temp_file_dir_list = []
     all_metadata = []
 
-    # List all files in the folder
-    all_files = manager.list_files(folder_id, page_size=20)
+    # List all files in the folder (with their checksum & size), only the new ones in incremental mode.
+    # The pull time is taken before listing so files modified meanwhile are picked up next run.
+    pulled_at = datetime.now(timezone.utc).strftime('%Y-%m-%dT%H:%M:%SZ')
+    modified_after = get_listing_watermark(folder_id) if GDriveConstants.INCREMENTAL_LISTING else None
+    if modified_after:
+        logger.info(f'Incremental listing of files modified or created after {modified_after}')
+    all_files = manager.list_files(folder_id, page_size=GDriveConstants.LIST_PAGE_SIZE, modified_after=modified_after)
+
+    # Statements already loaded (same content hash) are skipped before downloading them
+    if all_files and DBConstants.SKIP_INGESTED_FILES:
+        loaded_hashes = IngestionLedger().get_loaded_hashes(file.get('md5Checksum') for file in all_files)
+        if loaded_hashes:
+            skipped = [file for file in all_files if file.get('md5Checksum') in loaded_hashes]
+            logger.info(f'Skipping {len(skipped)} already ingested files: {json.dumps([file["name"] for file in skipped])}')
+            # Their source copies are still removed, as they would have been after their first load
+            _ingested_file_ids[folder_id] = [file['id'] for file in skipped if file.get('id')]
+            all_files = [file for file in all_files if file.get('md5Checksum') not in loaded_hashes]
 
-    # Download the first file if available
+    # Download the files concurrently, MD5 is computed while streaming
+    local_checksums = {}
+    file_context = {}
     if all_files:
-        for file in all_files:
-            destination_path = os.path.join(temp_dir, file['name'])
-            file_metadata = manager.file_downloader(file['id'], destination_path)
+        for destination_path, file_metadata in manager.download_files(all_files, temp_dir,
+                                                                      max_workers=GDriveConstants.DOWNLOAD_CONCURRENCY):
             temp_file_dir_list.append(destination_path)
             all_metadata.append(file_metadata)
+            local_checksums[os.path.basename(destination_path)] = file_metadata['local_md5Checksum']
+
+            # Drive IDs are carried along so the source files can be deleted without name lookups
+            file_context[destination_path] = {key: file_metadata.get(key) for key in
+                                              ('id', 'name', 'md5Checksum', 'size', 'modifiedTime')}
+            file_context[destination_path]['source'] = 'gdrive'
+            file_context[destination_path]['content_hash'] = file_metadata['local_md5Checksum']
+
+    # Next incremental listing can start from this pull once every file is loaded (see `commit_listing_state`),
+    # unless a download (or below, the decryption) of a file failed
+    if GDriveConstants.INCREMENTAL_LISTING and len(temp_file_dir_list) == len(all_files or []):
+        _pending_listing_state[folder_id] = pulled_at
     logger.debug(f'All File Metadata files in Drive:')
     logger.debug(json.dumps(all_metadata, indent=4))
     logger.info(f"Total no of Files Downloaded to `{ConstantRetriever.TEMP_DOWNLOAD_DIR}` Location: {len(temp_file_dir_list)}")
@@ -52,26 +130,32 @@ def pull_gdrive_data(folder_id):
     
     if temp_file_dir_list:
         # Data integrity Check
-        dq_validation = DataQualityValidation(file_dir_list=temp_file_dir_list, all_metadata=all_metadata)
+        dq_validation = DataQualityValidation(file_dir_list=temp_file_dir_list, all_metadata=all_metadata,
+                                              local_checksums=local_checksums)
         file_to_process = dq_validation.dq_validation()
 
         # Decryption Stage
         unlocker = PDFUnlocker(file_paths_list=temp_file_dir_list)
-        unlocked_pdfs, _ = unlocker.process_all_unlocked_files(passwords_source='./inputs/passwords.yaml',
-                                                                     passwords_key='passwords')
+        unlocked_pdfs, cannot_unlock_pdfs = unlocker.process_all_unlocked_files(passwords_source='./inputs/passwords.yaml',
+                                                                                passwords_key='passwords')
         logger.info(f'No of files unlocked : `{len(unlocked_pdfs)}`')
+        for pdf_path, password in unlocker.passwords.items():
+            file_context.setdefault(pdf_path, {})['password'] = password
         logger.debug(f'Unlocked files : {get_file_nm_list(unlocked_pdfs)}')
         
         file_to_process = unlocked_pdfs
 
+        if cannot_unlock_pdfs:
+            _pending_listing_state.pop(folder_id, None)
+
         file_nm_to_process = get_file_nm_list(file_to_process)
         logger.info(f"List of Files to be processed:{json.dumps(file_nm_to_process)}")
         
-        return temp_dir, file_nm_to_process, file_to_process
+        return temp_dir, file_nm_to_process, file_to_process, file_context
     else:
         logger.error(f'No files found in GDrive folderID: {folder_id}')
         # logger.error(f'Termination the Program')
         # sys.exit()
-        return None, None, None
+        return None, None, None, None
     
 
@@ -1,16 +1,18 @@
 import os
-from typing import List
+import io
+import gzip
+from typing import List, Tuple
 import time
-import gc, json
+import json
 from src.components.env_cred_loader import get_credential_path
 from src.gcs_utils.gcs_connection import GoogleAuthenticator
-from src.gcs_utils.gcs_connection import GoogleOAuth2Service
+from src.gcs_utils.gcs_client_pool import DriveClientPool
 from google.oauth2.credentials import Credentials
 from google_auth_oauthlib.flow import InstalledAppFlow
-from googleapiclient.discovery import build
-from googleapiclient.http import MediaFileUpload
+from googleapiclient.http import MediaIoBaseUpload
 from google.auth.transport.requests import Request
-from constants import GoogleAuthConstants
+from constants import GoogleAuthConstants, GDriveConstants
+from src.components.utils import parallel_map_thread
 from src.components.logfactory import get_logger
 from dotenv import load_dotenv
 load_dotenv()
@@ -55,21 +57,33 @@ def authenticate_for_delete():
 
     return creds
 
-def upload_or_update_file_to_gdrive(data, gdrive_folder_id, new_file_name):
+def upload_or_update_file_to_gdrive(data, gdrive_folder_id, new_file_name, compress=GDriveConstants.BACKUP_GZIP):
     """
-    Uploads a pandas DataFrame as CSV to Google Drive folder.
+    Uploads a pandas DataFrame (or an already written CSV, as a binary file object) as CSV to Google Drive folder.
     If a file with the same name exists and is NOT a binary file, updates it.
     If a binary file with the same name exists, skips upload.
-    """
-    
-    # creds = authenticate_for_delete()
-    # logger.info(f'Upload File Cred: {creds}')
-    # service = build('drive', 'v3', credentials=creds)
 
-    service,_,_ = GoogleOAuth2Service.initialize_auth_service_built()
+    A DataFrame is serialized in memory (gzip compressed as `<name>.gz` when `compress`)
+    and uploaded from the buffer, nothing is written to the local disk.
+
+    Returns:
+        bool: True once the backup is in the folder (or deliberately skipped), False if the upload failed.
+    """
+    service = DriveClientPool.get_service()
 
-    # Save DataFrame locally as CSV
-    data.to_csv(new_file_name, index=False)
+    if hasattr(data, 'to_csv'):
+        # Serialize the DataFrame as CSV in memory
+        csv_buffer = io.BytesIO(data.to_csv(index=False).encode('utf-8'))
+    else:
+        # CSV written incrementally (e.g. by the streaming mode)
+        data.seek(0)
+        csv_buffer = data
+    if compress:
+        new_file_name = f'{new_file_name}.gz'
+        csv_buffer = io.BytesIO(gzip.compress(csv_buffer.read(), mtime=0))
+        mime_type_upload = 'application/gzip'
+    else:
+        mime_type_upload = 'text/csv'
 
     # Search for existing file with the same name in the folder, including mimeType
     query = f"name = '{os.path.basename(new_file_name)}' and '{gdrive_folder_id}' in parents and trashed = false"
@@ -81,7 +95,7 @@ def upload_or_update_file_to_gdrive(data, gdrive_folder_id, new_file_name):
     ).execute()
     files = results.get('files', [])
 
-    media = MediaFileUpload(new_file_name)
+    media = MediaIoBaseUpload(csv_buffer, mimetype=mime_type_upload, resumable=False)
 
     try:
         if files:
@@ -101,7 +115,7 @@ def upload_or_update_file_to_gdrive(data, gdrive_folder_id, new_file_name):
             logger.debug(f'Checking Mime Type: {mime_type}')
             if mime_type in binary_mime_types:
                 logger.info(f"File '{existing_file['name']}' exists as binary type '{mime_type}'. Skipping upload/update.")
-                return  # Skip upload/update for binary files
+                return True  # Skip upload/update for binary files
 
             # Otherwise update the file
             logger.info(f"File exists with ID: {file_id} and MIME type: {mime_type}. Updating file...")
@@ -122,19 +136,39 @@ def upload_or_update_file_to_gdrive(data, gdrive_folder_id, new_file_name):
                 fields='id'
             ).execute()
             logger.info(f"Uploaded new file ID: {new_file.get('id')}")
+        return True
     except Exception as e:
         logger.error(f'Error occured while updating/uploading the backup file :{e}')
-    
-    # Deleting Delta Backup file from local
-    media = None    
-    gc.collect()        # Force Garbage Collection
-    time.sleep(2)
-    if os.path.exists(new_file_name):
+        return False
+
+def upload_backups_to_gdrive(backups: List[Tuple], gdrive_folder_id, max_workers=GDriveConstants.BACKUP_UPLOAD_CONCURRENCY):
+    """
+    Uploads the backups of a whole run concurrently (one Drive client per thread).
+
+    Args:
+        backups: list of (DataFrame or CSV file object, file name) pairs; file objects are closed once uploaded.
+        gdrive_folder_id: The ID of the backup Google Drive folder.
+
+    Returns:
+        list: upload status (bool) of every backup, in input order.
+    """
+    def upload(backup):
+        data, new_file_name = backup
         try:
-            os.remove(new_file_name)
-            logger.debug(f"Deleted local file: {new_file_name}")
+            return upload_or_update_file_to_gdrive(data=data, gdrive_folder_id=gdrive_folder_id, new_file_name=new_file_name)
         except Exception as e:
-            logger.error(f'Error occured while deleting Backup file from Local: {e}')
+            logger.error(f'Error while uploading backup `{new_file_name}` to GDrive: {e}')
+            return False
+        finally:
+            if not hasattr(data, 'to_csv'):
+                data.close()
+
+    if not backups:
+        return []
+    start_time = time.perf_counter()
+    uploaded = parallel_map_thread(upload, backups, max_workers=max_workers)
+    logger.info(f'Uploaded {sum(uploaded)} of {len(backups)} backup files in {time.perf_counter() - start_time:.2f}s')
+    return uploaded
 
 def delete_file_from_gdrive(file_name: str, folder_id: str):
     """
@@ -150,8 +184,7 @@ def delete_file_from_gdrive(file_name: str, folder_id: str):
     # This credential token is build with OAuth2.0 Authentication API since this need to delete file.
     # Make sure files are uploaded via owner account 
     # Files are shared to Service Account
-    creds = authenticate_for_delete()
-    service = build('drive', 'v3', credentials=creds) # If you handle authentication outside, or use a service account key
+    service = DriveClientPool.get_service(profile='delete')
 
     try:
         # Search for the file by name within the specified folder
@@ -196,4 +229,44 @@ def delete_file_from_gdrive(file_name: str, folder_id: str):
         logger.info(f"File '{found_name}' (ID: {file_id}) deleted successfully.")
 
     except Exception as e:
-        logger.error(f"Error occured while Source File Deletion: {e}")
\ No newline at end of file
+        logger.error(f"Error occured while Source File Deletion: {e}")
+
+def delete_files_from_gdrive(file_ids: List[str]):
+    """
+    Deletes Google Drive files by ID using batch HTTP requests
+    (up to `GDriveConstants.BATCH_REQUEST_LIMIT` deletes per request).
+
+    Args:
+        file_ids: IDs of the files to delete (as listed by `pull_gdrive_data`).
+
+    Returns:
+        list of the IDs deleted successfully.
+    """
+    if not file_ids:
+        return []
+
+    # Owner credential, same as `delete_file_from_gdrive`
+    service = DriveClientPool.get_service(profile='delete')
+    deleted, failed = [], {}
+
+    def callback(request_id, response, exception):
+        if exception is not None:
+            failed[request_id] = exception
+        else:
+            deleted.append(request_id)
+
+    limit = GDriveConstants.BATCH_REQUEST_LIMIT
+    for start in range(0, len(file_ids), limit):
+        batch = service.new_batch_http_request(callback=callback)
+        for file_id in file_ids[start:start + limit]:
+            batch.add(service.files().delete(fileId=file_id, supportsAllDrives=True), request_id=file_id)
+        try:
+            batch.execute()
+        except Exception as e:
+            logger.error(f"Error occured while Source File batch Deletion: {e}")
+
+    logger.info(f"Deleted {len(deleted)} of {len(file_ids)} source files in "
+                f"{(len(file_ids) + limit - 1) // limit} batch request(s).")
+    for file_id, exception in failed.items():
+        logger.error(f"Could not delete file ID '{file_id}': {exception}")
+    return deleted
@@ -1,6 +1,7 @@
 import pandas as pd
 from tqdm import tqdm
-import os, logging, sys
+import os, logging, sys, time
+import tempfile
 from src.argument.arg_parser import parse_and_store_args
 from src.components.logfactory import get_logger, set_global_log_level
 
@@ -8,18 +9,22 @@ set_global_log_level(logging.INFO)
 logger = get_logger(name='main', log_level=logging.INFO, log_to_file=True)
 
 from src.gcs_utils.gcs_connection import GoogleOAuth2Service
-from src.gcs_utils.gcs_orchestration import pull_gdrive_data
+from src.gcs_utils.gcs_orchestration import pull_gdrive_data, commit_listing_state, pop_ingested_file_ids
 from src.data_processor.fetch_src_file import FileFetcher
-from src.data_processor.data_ingestion import DataOrchestrator
+from src.data_processor.data_pipeline import extract_and_categorize, extract_and_categorize_worker, iter_extract_and_categorize
+from src.data_processor.data_pipeline import init_categorization_worker
 from src.data_processor.data_transformer import DataTransformation
 from src.db_operations.delta_lake import DB_DeltaHandler
-from src.components.utils import parallel_apply_process, remove_temp_dir
-from src.gcs_utils.gdrive_operations import upload_or_update_file_to_gdrive
-from src.gcs_utils.gdrive_operations import  delete_file_from_gdrive
-from constants import ConstantRetriever, DBConstants
+from src.components.utils import parallel_map_process, remove_temp_dir
+from src.gcs_utils.gdrive_operations import upload_or_update_file_to_gdrive, upload_backups_to_gdrive
+from src.gcs_utils.gdrive_operations import  delete_file_from_gdrive, delete_files_from_gdrive
+from constants import ConstantRetriever, DBConstants, GDriveConstants
 from src.db_operations.sql_procedure import SQL_Procedure
+from src.db_operations.ingestion_ledger import IngestionLedger
 from src.utils.dq_integrity import safe_list
 import datetime
+from functools import partial
+from itertools import chain
 from dotenv import load_dotenv
 
 # Load Environment details from .env/ file
@@ -29,102 +34,283 @@ load_dotenv()
 tqdm.pandas(desc="Progress Bar")
 
 
+def statement_stats(df: pd.DataFrame) -> dict:
+    ''' Bank, statement period & row count of a parsed statement (or of a streamed batch) '''
+    stats = {'bank': None, 'period_start': None, 'period_end': None, 'row_count': 0}
+    if df is None or df.empty:
+        return stats
+    stats['bank'] = df['Bank'].iloc[0] if 'Bank' in df.columns else None
+    stats['row_count'] = len(df)
+    if 'Date' in df.columns:
+        dates = pd.to_datetime(df['Date'], dayfirst=True, errors='coerce').dropna()
+        if not dates.empty:
+            stats['period_start'], stats['period_end'] = dates.min().date(), dates.max().date()
+    return stats
+
+
+def merge_statement_stats(stats: dict, batch_stats: dict) -> dict:
+    ''' Adds the stats of a streamed batch to the stats of the statement so far '''
+    starts = [d for d in (stats['period_start'], batch_stats['period_start']) if d is not None]
+    ends = [d for d in (stats['period_end'], batch_stats['period_end']) if d is not None]
+    return {'bank': stats['bank'] or batch_stats['bank'],
+            'period_start': min(starts) if starts else None,
+            'period_end': max(ends) if ends else None,
+            'row_count': stats['row_count'] + batch_stats['row_count']}
+
+
+def stream_and_load_statement(file, handler: DB_DeltaHandler, batch_size: int, page_workers: int = 1, password: str = None):
+    ''' Streams a statement batch by batch into the Database while it is being parsed.
+
+        No batch is kept: each one is appended to the CSV backup (in memory up to
+        `GDriveConstants.BACKUP_SPOOL_MAX_SIZE`, then spilled to a temp file) and summarized.
+        With `DBConstants.BULK_LOAD` the rows are buffered and written in one short transaction
+        once the statement is parsed.
+
+        Returns:
+            (CSV backup file object, statement stats, load_delta status) or (None, None, None) if no data
+    '''
+    batches = iter_extract_and_categorize(file, batch_size=batch_size, page_workers=page_workers, password=password)
+
+    # Bank name is required upfront by the delta logic, so peek the first batch
+    first_batch = next(batches, None)
+    if first_batch is None:
+        return None, None, None
+    bank_name = first_batch['Bank'][0]
+
+    backup = tempfile.SpooledTemporaryFile(max_size=GDriveConstants.BACKUP_SPOOL_MAX_SIZE)
+    stats = statement_stats(None)
+    def backup_batches():
+        nonlocal stats
+        for batch_no, batch in enumerate(chain([first_batch], batches)):
+            backup.write(batch.to_csv(index=False, header=batch_no == 0).encode('utf-8'))
+            stats = merge_statement_stats(stats, statement_stats(batch))
+            yield batch
+
+    load_batches = handler.load_delta_bulk if DBConstants.BULK_LOAD else handler.load_delta_batches
+    try:
+        load_delta_status = load_batches(backup_batches(), expected_columns=DBConstants.TRANSACTION_T_COLS,
+                                         bank_name=bank_name, target_table=DBConstants.TRANSACTION_TABLE)
+    except Exception:
+        backup.close()
+        raise
+    return backup, stats, load_delta_status
+
+
+def run_recategorization(load_batch_ids: list):
+    ''' Post-load SQL updates, in one pass, for every load not recategorized yet.
+
+        Pending loads are selected in SQL, so loads of a run which crashed before its
+        recategorization are picked up too; `load_batch_ids` only tracks this run's cadence.
+    '''
+    start_time = time.perf_counter()
+    rowcounts = SQL_Procedure.trigger_sql_procedure(pending_only=True)
+    logger.info(f'Recategorization of pending loads ({len(load_batch_ids)} from this run) took '
+                f'{time.perf_counter() - start_time:.2f}s, rows updated: {rowcounts}')
+    load_batch_ids.clear()
+
+
+def spill_backup(backup_data):
+    ''' Moves a backup waiting for the batched upload to a temp file on disk '''
+    if hasattr(backup_data, 'to_csv'):
+        backup = tempfile.TemporaryFile()
+        backup.write(backup_data.to_csv(index=False).encode('utf-8'))
+        return backup
+    backup_data.rollover()
+    return backup_data
+
+
+def record_ingestion(ledger: IngestionLedger, file, file_info: dict, stats: dict = None, loaded: bool = False):
+    ''' Records the outcome of a statement in the Ingestion ledger (bank, period & row count when parsed) '''
+    stats = stats or statement_stats(None)
+    ledger.record(content_hash=file_info.get('content_hash'), file_name=file_info.get('name') or os.path.basename(file),
+                  status=IngestionLedger.STATUS_LOADED if loaded else IngestionLedger.STATUS_FAILED,
+                  source=file_info.get('source'), bank=stats['bank'], period_start=stats['period_start'],
+                  period_end=stats['period_end'], row_count=stats['row_count'] or None,
+                  secondary_digest=file_info.get('secondary_digest'))
+
+
+def queue_source_delete(pending_source_deletes: list, source_folder_id, file_info: dict, source_file_nm: str):
+    ''' Queues the Drive source file for the batch delete by ID, or deletes it by name when its ID is unknown '''
+    file_id = file_info.get('id')
+    if file_id:
+        pending_source_deletes.append(file_id)
+        return
+    try:
+        delete_file_from_gdrive(file_name=source_file_nm, folder_id=source_folder_id)
+    except Exception as e:
+        logger.error(f'Error Occured while removing SOURCE file - `{source_file_nm}` from Gdrive: {e}')
+
+
 def main():
 
     # arguments recieved from terminal which trigering the script. 
     args = parse_and_store_args()
     SRC_FOLDER_ID = args['src_gdrive']
     BACKUP_FOLDER_ID = args['backup']
+    WORKERS = max(1, args.get('workers') or 1)
+    PAGE_WORKERS = max(1, args.get('page_workers') or 1)
+    STREAM_BATCH = max(0, args.get('stream_batch') or 0)
+    SQL_EVERY = max(0, args.get('sql_every') or 0)
+    if STREAM_BATCH and WORKERS > 1:
+        logger.warning(f'`--stream_batch` is ignored when `--workers` > 1')
+        STREAM_BATCH = 0
 
     job_run_date = datetime.date.today()
     
     try:
-        temp_dir, file_list_nm, file_list_dir = pull_gdrive_data(folder_id=SRC_FOLDER_ID)
+        temp_dir, file_list_nm, file_list_dir, file_context = pull_gdrive_data(folder_id=SRC_FOLDER_ID)
+        file_context = file_context or {}
 
         # Flag to check if files are present in GDrive
         is_present_in_gdrive = len(safe_list(file_list_nm))>0
 
         # Condition if no files are present in GDrive, then pull from local
         if not is_present_in_gdrive:
-            temp_dir, local_file_list_nm, local_file_list_dir = FileFetcher.pull_local_file(src_folder=ConstantRetriever.SOURCE_LOCAL_DIR)
+            temp_dir, local_file_list_nm, local_file_list_dir, local_file_context = FileFetcher.pull_local_file(src_folder=ConstantRetriever.SOURCE_LOCAL_DIR)
 
             # Append the list of files from both sources
             file_list_nm = safe_list(file_list_nm) + safe_list(local_file_list_nm)
             file_list_dir = safe_list(file_list_dir) + safe_list(local_file_list_dir)
+            file_context.update(local_file_context or {})
             # temp_dir = safe_list(temp_dir) + safe_list(local_temp_dir)
     except Exception as e:
         logger.error(f'Error occured while pulling data from Sources: {e}')
         logger.error(f'Exiting the Program')
         sys.exit(1)
 
-    idx = 0
-
     # Data Orchestration Started
     logger.info(f"------------------------------------------------------------------")
     logger.info('Orchestration in Progress.......')
     logger.info(f"------------------------------------------------------------------")
 
-    for file in file_list_dir:
+    # Make Database Directory
+    os.makedirs(os.path.dirname(DBConstants.DB_PATH), exist_ok=True)
 
-        data_orch_obj = DataOrchestrator(file)
-        df = data_orch_obj.get_ingestion_pipeline()
+    # Categorization engine is built (or loaded from its snapshot) once for the whole run
+    DataTransformation.get_shared()
 
-        logger.debug(f'Dataframe Generated for: |`{file_list_nm[idx]}`|')
-        logger.debug(f'Columns  {df.columns}')
-        
-        transformer = DataTransformation()
-        logger.info(f'Data Transformation for file - `{file_list_nm[idx]}` in progress.......')
-
-        # Progress bar for categorization wil applying parallel processing
-        tqdm.pandas(desc="Categorizeing Data")
-        logger.info(f'Processing Transformation on `SUBCATEGORY`......')
-        df['Subcategory'] = df['Particulars'].progress_apply(transformer.particular_scrapper)
-        if 'Subcategory' in df.columns:
-            logger.info(f'Processing Transformation on `CATEGORY`......')
-            df['Category'] = df['Subcategory'].progress_apply(transformer.category_mapper)
-
-        # Data Copy for Gsheet
-        parsed_df = df.copy()
-
-        # Backup the dataframes to googledrive on every run
-        file_upload_nm = file_list_nm[idx].replace('.pdf', '.csv')
-        file_upload = f"{job_run_date}_{file_upload_nm}"
-
-        # Backup the Source file after Data Transformation as a Backups
-        try:
-            upload_or_update_file_to_gdrive(data=df, 
-                                            gdrive_folder_id=BACKUP_FOLDER_ID, 
-                                            new_file_name=file_upload)
-        except Exception as e: 
-            logger.error(f'Error while uploading file to GDrive: {e}')
+    # Encrypted statements are decrypted in memory with the password found by the unlocker
+    file_passwords = [file_context.get(file, {}).get('password') for file in file_list_dir]
 
+    # Extraction & Categorization runs per file on a process pool when `--workers` > 1.
+    # Results come back in the order of `file_list_dir`, so the DB writes below stay deterministic.
+    if STREAM_BATCH:
+        # Streaming mode: extraction, categorization and DB load happen together in the loop below
+        processed_dfs = (None for _ in file_list_dir)
+    elif WORKERS > 1 and len(file_list_dir) > 1:
+        logger.info(f'Extracting & Categorizing {len(file_list_dir)} files with {WORKERS} worker processes')
+        processed_dfs = parallel_map_process(partial(extract_and_categorize_worker, page_workers=PAGE_WORKERS),
+                                             file_list_dir, file_passwords, max_workers=WORKERS,
+                                             initializer=partial(init_categorization_worker,
+                                                                 fingerprint=DataTransformation.get_fingerprint()))
+    else:
+        processed_dfs = (extract_and_categorize(file, page_workers=PAGE_WORKERS, password=password)
+                         for file, password in zip(file_list_dir, file_passwords))
 
-        if 'Bank' in df.columns:
-            bank_name = df['Bank'][0]
+    # Load batches waiting for the post-load SQL updates
+    pending_load_batch_ids = []
+    # CSV backups waiting for the concurrent upload, and the ledger entries of their statements
+    pending_backups = []
+    pending_ingestions = []
+    # Drive IDs of the source files loaded & backed up, and of the ones skipped as already ingested
+    pending_source_deletes = pop_ingested_file_ids(SRC_FOLDER_ID)
+    ingestion_ledger = IngestionLedger()
+    # Incremental listing watermark only moves when every file of the run is loaded
+    all_files_loaded = True
 
-        # Make Database Directory
-        os.makedirs(os.path.dirname(DBConstants.DB_PATH), exist_ok=True)
+    for idx, df in enumerate(processed_dfs):
 
         # Create DeltaHandler instance
         handler = DB_DeltaHandler(db_name=DBConstants.DB_PATH, metadata_table=DBConstants.LOAD_STATUS_TABLE)
+        load_delta_status = None
 
-        # Load data with delta logic; this will also check & create the table if needed
-        load_delta_status = handler.load_delta(df, expected_columns=DBConstants.TRANSACTION_T_COLS, 
-                        bank_name=bank_name, target_table=DBConstants.TRANSACTION_TABLE)
-        
-        # Functionality to Update Rows on Database
-        if load_delta_status == 1:
-            SQL_Procedure.trigger_sql_procedure()        
-        
-        # Remove the source file from gdrive after processing
-        if is_present_in_gdrive:
+        if STREAM_BATCH:
+            # Streamed statements come back as their CSV backup, the batches are not kept
             try:
-                delete_file_from_gdrive(file_name=file_list_nm[idx], folder_id=SRC_FOLDER_ID)
+                backup_data, stats, load_delta_status = stream_and_load_statement(file_list_dir[idx], handler,
+                                                                                  batch_size=STREAM_BATCH, page_workers=PAGE_WORKERS,
+                                                                                  password=file_passwords[idx])
             except Exception as e:
-                logger.error(f'Error Occured while removing SOURCE file - `{file_list_nm[idx]}` from Gdrive: {e}')
+                logger.error(f'Error while streaming file - `{file_list_nm[idx]}`: {e}')
+                backup_data = None
+        else:
+            backup_data, stats = df, statement_stats(df)
+
+        if backup_data is None:
+            logger.error(f'Skipping file - `{file_list_nm[idx]}` as no data could be processed')
+            all_files_loaded = False
+            record_ingestion(ingestion_ledger, file_list_dir[idx], file_context.get(file_list_dir[idx], {}))
+            logger.info(f'---------------------------------------------------------------------------------')
+            continue
+
+        # Backup the dataframes to googledrive on every run (under the source name, local copies may be renamed)
+        source_file_nm = file_context.get(file_list_dir[idx], {}).get('name') or file_list_nm[idx]
+        file_upload_nm = source_file_nm.replace('.pdf', '.csv')
+        file_upload = f"{job_run_date}_{file_upload_nm}"
+
+        # Backup the Source file after Data Transformation as a Backups (batched to the end of the run)
+        backed_up = False
+        if GDriveConstants.BATCH_BACKUP_UPLOADS:
+            pending_backups.append((spill_backup(backup_data), file_upload))
+        else:
+            try:
+                backed_up = upload_or_update_file_to_gdrive(data=backup_data, 
+                                                            gdrive_folder_id=BACKUP_FOLDER_ID, 
+                                                            new_file_name=file_upload)
+            except Exception as e: 
+                logger.error(f'Error while uploading file to GDrive: {e}')
+            finally:
+                if STREAM_BATCH:
+                    backup_data.close()
+
+        bank_name = stats['bank']
+
+        # Load data with delta logic; this will also check & create the table if needed
+        if not STREAM_BATCH:
+            load_delta = handler.load_delta_bulk if DBConstants.BULK_LOAD else handler.load_delta
+            load_delta_status = load_delta(df, expected_columns=DBConstants.TRANSACTION_T_COLS, 
+                            bank_name=bank_name, target_table=DBConstants.TRANSACTION_TABLE)
+
+        # Content hash of the statement is recorded so reruns skip it, as loaded only once its backup is uploaded
+        if GDriveConstants.BATCH_BACKUP_UPLOADS:
+            pending_ingestions.append((file_list_dir[idx], source_file_nm, stats, load_delta_status == 1))
+        else:
+            record_ingestion(ingestion_ledger, file_list_dir[idx], file_context.get(file_list_dir[idx], {}),
+                             stats=stats, loaded=load_delta_status == 1 and backed_up)
+            all_files_loaded = all_files_loaded and load_delta_status == 1 and backed_up
+
+            # Source file is removed from gdrive only once it is loaded and backed up (batched by ID at the end of the run)
+            if is_present_in_gdrive and load_delta_status == 1 and backed_up:
+                queue_source_delete(pending_source_deletes, SRC_FOLDER_ID, file_context.get(file_list_dir[idx], {}),
+                                    source_file_nm)
+        
+        # Rows are updated on Database once per `--sql_every` files (or at the end of the run)
+        if load_delta_status == 1 and handler.last_load_batch_id:
+            pending_load_batch_ids.append(handler.last_load_batch_id)
+            if SQL_EVERY and len(pending_load_batch_ids) >= SQL_EVERY:
+                run_recategorization(pending_load_batch_ids)
         
         logger.info(f'---------------------------------------------------------------------------------')
-        idx = idx +1
+
+    # Functionality to Update Rows on Database
+    run_recategorization(pending_load_batch_ids)
+
+    # Backup of every processed file, uploaded concurrently
+    backups_uploaded = upload_backups_to_gdrive(pending_backups, gdrive_folder_id=BACKUP_FOLDER_ID)
+    for (file, source_file_nm, stats, loaded), backed_up in zip(pending_ingestions, backups_uploaded):
+        record_ingestion(ingestion_ledger, file, file_context.get(file, {}), stats=stats, loaded=loaded and backed_up)
+        all_files_loaded = all_files_loaded and loaded and backed_up
+        if is_present_in_gdrive and loaded and backed_up:
+            queue_source_delete(pending_source_deletes, SRC_FOLDER_ID, file_context.get(file, {}), source_file_nm)
+
+    if all_files_loaded:
+        commit_listing_state(SRC_FOLDER_ID)
+
+    # Remove the processed source files from gdrive
+    try:
+        delete_files_from_gdrive(pending_source_deletes)
+    except Exception as e:
+        logger.error(f'Error Occured while removing SOURCE files from Gdrive: {e}')
 
     # Removing the temp directory after Operation
     delete_temp_dir = remove_temp_dir(temp_dir)
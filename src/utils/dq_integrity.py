@@ -1,7 +1,10 @@
 import os
+import time
 import hashlib
 from typing import List
 from src.components.logfactory import get_logger
+from src.components.utils import parallel_map_thread
+from constants import IntegrityConstants
 
 logger = get_logger(__name__)
 
@@ -12,26 +15,65 @@ class DataIntegrityChecker:
         """
         self.file_paths = file_paths or []
 
-    def md5_checksum(self, file_path, chunk_size=8192):
+    def md5_checksum(self, file_path, chunk_size=IntegrityConstants.HASH_CHUNK_SIZE):
         """
         Calculate the MD5 checksum of a file.
         :param file_path: Path to the file
         :param chunk_size: Number of bytes to read at a time
         :return: Hexadecimal MD5 checksum string
         """
+        digest = self.file_digest(file_path, chunk_size=chunk_size, secondary_digest=None)
+        return digest['md5'] if digest else None
+
+    @staticmethod
+    def file_digest(file_path, chunk_size=IntegrityConstants.HASH_CHUNK_SIZE,
+                    secondary_digest=IntegrityConstants.SECONDARY_DIGEST):
+        """
+        Size, MD5 and optionally a secondary digest (e.g. 'blake2b') of a file in a single read pass.
+        Chunks are read into one reusable buffer; hashlib releases the GIL while hashing them,
+        so several files can be digested in parallel threads.
+        :param file_path: Path to the file
+        :param chunk_size: Number of bytes to read at a time (1 MB by default)
+        :param secondary_digest: hashlib algorithm name of the secondary digest, or None
+        :return: Dictionary with `size`, `md5` and `secondary_digest` (None if not requested)
+        """
         try:
             md5 = hashlib.md5()
-            with open(file_path, 'rb') as f:
+            secondary = hashlib.new(secondary_digest) if secondary_digest else None
+            size = 0
+            buffer = bytearray(chunk_size)
+            view = memoryview(buffer)
+            with open(file_path, 'rb', buffering=0) as f:
                 while True:
-                    chunk = f.read(chunk_size)
-                    if not chunk:
+                    read = f.readinto(buffer)
+                    if not read:
                         break
+                    chunk = view[:read]
                     md5.update(chunk)
-            return md5.hexdigest()
+                    if secondary is not None:
+                        secondary.update(chunk)
+                    size += read
+            return {'size': size, 'md5': md5.hexdigest(),
+                    'secondary_digest': secondary.hexdigest() if secondary is not None else None}
         except Exception as e:
             logger.error(f"Could not process {file_path}: {e}")
             return None
 
+    def digest_files(self, file_paths=None, max_workers=IntegrityConstants.HASH_WORKERS,
+                     secondary_digest=IntegrityConstants.SECONDARY_DIGEST):
+        """
+        Digests a list of files on a thread pool.
+        :param file_paths: List of file paths
+        :return: Dictionary mapping file paths to their `file_digest` (None if unreadable)
+        """
+        file_paths = file_paths or self.file_paths
+        start_time = time.perf_counter()
+        digests = parallel_map_thread(lambda file_path: self.file_digest(file_path, secondary_digest=secondary_digest),
+                                      file_paths, max_workers=max_workers)
+        total_size = sum(digest['size'] for digest in digests if digest)
+        elapsed = time.perf_counter() - start_time
+        logger.debug(f"Hashed {len(file_paths)} files ({total_size / 1e6:.1f} MB) in {elapsed:.2f}s")
+        return dict(zip(file_paths, digests))
 
     def md5_for_files(self, file_paths=None):
         """
@@ -39,32 +81,25 @@ class DataIntegrityChecker:
         :param file_paths: List of file paths
         :return: Dictionary mapping file paths to MD5 checksums
         """
-        file_paths = file_paths or self.file_paths
         checksums = {}
-        for file_path in file_paths:
-            try:
-                checksum = self.md5_checksum(file_path)
-                file_nm  = os.path.basename(file_path)
-                checksums[file_nm] = checksum
-            except Exception as e:
-                logger.error(f"Could not process {file_path}: {e}")
+        for file_path, digest in self.digest_files(file_paths, secondary_digest=None).items():
+            file_nm  = os.path.basename(file_path)
+            checksums[file_nm] = digest['md5'] if digest else None
         return checksums
 
-    def get_file_sizes(self, file_paths=None):
+    def get_file_sizes(self, file_paths=None, digests=None):
         """
-        Get sizes of a list of files.
+        Get sizes of a list of files, as counted by the digest pass (no separate stat of the files).
         :param file_paths: List of file paths
-        :return: Dictionary mapping file paths to their sizes in bytes
+        :param digests: Output of `digest_files` to reuse, digested here when not given
+        :return: Dictionary mapping file names to their sizes in bytes
         """
-        file_paths = file_paths or self.file_paths
+        if digests is None:
+            digests = self.digest_files(file_paths, secondary_digest=None)
         file_sizes = {}
-        for file_path in file_paths:
-            try:
-                size = os.path.getsize(file_path)
-                file_nm  = os.path.basename(file_path)
-                file_sizes[file_nm] = size
-            except OSError as e:
-                logger.error(f"Could not access {file_path}: {e}")
+        for file_path, digest in digests.items():
+            if digest:
+                file_sizes[os.path.basename(file_path)] = digest['size']
         return file_sizes
     
 def safe_list(val):
@@ -1,5 +1,5 @@
 from src.utils.dq_integrity import DataIntegrityChecker  # Importing the utility class for data integrity check
-from typing import List
+from typing import Dict, List
 from src.components.logfactory import get_logger  # Importing the logger for logging messages
 import json
 
@@ -11,15 +11,18 @@ class DataQualityValidation:
     of local files against provided metadata.
     """
 
-    def __init__(self, file_dir_list: List[str], all_metadata: List[dict]):
+    def __init__(self, file_dir_list: List[str], all_metadata: List[dict], local_checksums: Dict[str, str] = None):
         """
         Constructor to initialize the file paths and metadata.
 
         :param file_dir_list: List of file paths to validate
         :param all_metadata: List of metadata dictionaries containing expected checksums
+        :param local_checksums: Optional file name -> MD5 of the local files, already computed
+                                (e.g. while downloading), skips re-reading the files
         """
         self.file_dir_list = file_dir_list
         self.all_metadata = all_metadata
+        self.local_checksums = local_checksums
 
     def dq_validation(self):
         """
@@ -34,18 +37,23 @@ class DataQualityValidation:
         logger.info(f"Data Integrity Checking.......")
         logger.info(f"------------------------------------------------------------------")
         
-        # Generate MD5 checksums for the files
-        md5_checksums = dq_validation.md5_for_files()
+        # Generate MD5 checksums for the files (unless computed during the download)
+        if self.local_checksums is not None:
+            md5_checksums = dict(self.local_checksums)
+        else:
+            md5_checksums = dq_validation.md5_for_files()
 
         # Dictionary to hold filename -> expected checksum from metadata
         required_metadata = {}
         try:
             # Extract expected MD5 checksums from the metadata
             for metadata in self.all_metadata:
+                # Duplicated Drive names are downloaded under a `local_name`
+                file_name = metadata.get('local_name', metadata['name'])
                 if 'md5Checksum' in metadata:
-                    required_metadata[metadata['name']] = metadata['md5Checksum']
+                    required_metadata[file_name] = metadata['md5Checksum']
                 else:
-                    required_metadata[metadata['name']] = None  # If checksum not found, store as None
+                    required_metadata[file_name] = None  # If checksum not found, store as None
             
             logger.debug(f'Source file from Drive with Checksum: \n{json.dumps(md5_checksums, indent=3)}')
         except Exception as e:
@@ -0,0 +1,77 @@
+"""
+Benchmark of the embedded keyword matching used by `DataTransformation.get_embedded_word`.
+
+Compares the per-token latency of the linear keyword scan against the precompiled
+`KeywordIndex` for growing keyword list sizes.
+
+Run:  python -m src.utils.keyword_benchmark --sizes 10 100 1000 5000 --tokens 2000
+"""
+import time
+import random
+import string
+import argparse
+from typing import List
+from src.components.keyword_index import KeywordIndex
+
+
+def linear_first_match(keywords: List[str], token: str):
+    for keyword in keywords:
+        if keyword in token or token in keyword:
+            return keyword
+    return None
+
+
+def random_word(rng: random.Random, min_len=3, max_len=12):
+    return ''.join(rng.choice(string.ascii_lowercase) for _ in range(rng.randint(min_len, max_len)))
+
+
+def make_tokens(rng: random.Random, keywords: List[str], count: int):
+    ''' Narration like tokens: a mix of keywords, keywords glued to noise and plain noise '''
+    tokens = []
+    for _ in range(count):
+        choice = rng.random()
+        if choice < 0.3:
+            tokens.append(rng.choice(keywords))
+        elif choice < 0.6:
+            tokens.append(random_word(rng, 2, 5) + rng.choice(keywords) + random_word(rng, 0, 4))
+        else:
+            tokens.append(random_word(rng))
+    return tokens
+
+
+def time_per_token(func, tokens: List[str]) -> float:
+    start = time.perf_counter()
+    for token in tokens:
+        func(token)
+    return (time.perf_counter() - start) / len(tokens)
+
+
+def run_benchmark(sizes: List[int], token_count: int, seed: int = 7):
+    rng = random.Random(seed)
+    print(f"{'keywords':>10} | {'linear (us/token)':>18} | {'index (us/token)':>17} | {'build (ms)':>10} | {'speedup':>8}")
+    print('-' * 76)
+
+    for size in sizes:
+        keywords = list(dict.fromkeys(random_word(rng) for _ in range(size)))
+        tokens = make_tokens(rng, keywords, token_count)
+
+        build_start = time.perf_counter()
+        index = KeywordIndex(keywords)
+        build_ms = (time.perf_counter() - build_start) * 1000
+
+        # Both implementations must agree before timing them
+        for token in tokens:
+            assert index.first_match(token) == linear_first_match(keywords, token), token
+
+        linear_us = time_per_token(lambda token: linear_first_match(keywords, token), tokens) * 1e6
+        index_us = time_per_token(index.first_match, tokens) * 1e6
+        print(f"{len(keywords):>10} | {linear_us:>18.2f} | {index_us:>17.2f} | {build_ms:>10.1f} | {linear_us / index_us:>7.1f}x")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark embedded keyword matching")
+    parser.add_argument('--sizes', type=int, nargs='+', default=[10, 100, 1000, 5000], help='Keyword list sizes')
+    parser.add_argument('--tokens', type=int, default=2000, help='No of tokens per size')
+    args = parser.parse_args()
+
+    run_benchmark(args.sizes, args.tokens)
@@ -0,0 +1,113 @@
+import re
+import threading
+import time
+
+
+class FakeResponse(dict):
+    """ httplib2 style response: headers as dict items plus a `status` """
+
+    def __init__(self, status, headers=None):
+        super().__init__(headers or {})
+        self.status = status
+
+
+class FakeCall:
+    """ Request object of the Drive client, `execute()` returns the prepared result """
+
+    def __init__(self, result):
+        self._result = result
+
+    def execute(self):
+        return self._result
+
+
+class FakeDriveStore:
+    """
+    In-memory Drive content shared by every fake service.
+
+    Media is served in ranges of at most `chunk_size` bytes (like a server answering with less
+    than the requested range), so a download takes several `next_chunk` calls. Every chunk
+    sleeps `latency` seconds and the peak of concurrent chunk requests is kept in `max_in_flight`.
+    """
+
+    def __init__(self, files, chunk_size=1024, latency=0.0):
+        # file id -> metadata with the `content` bytes
+        self.files = {file['id']: dict(file) for file in files}
+        self.chunk_size = chunk_size
+        self.latency = latency
+        self.list_calls = 0
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self._lock = threading.Lock()
+
+    def metadata(self, file_id):
+        return {key: value for key, value in self.files[file_id].items() if key != 'content'}
+
+    def serve_range(self, file_id, headers):
+        content = self.files[file_id]['content']
+        with self._lock:
+            self.in_flight += 1
+            self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        try:
+            time.sleep(self.latency)
+            if not content:
+                return FakeResponse(200, {'content-length': '0'}), b''
+            start, end = map(int, re.match(r'bytes=(\d+)-(\d+)', headers['range']).groups())
+            end = min(end, start + self.chunk_size - 1, len(content) - 1)
+            return FakeResponse(206, {'content-range': f'bytes {start}-{end}/{len(content)}'}), content[start:end + 1]
+        finally:
+            with self._lock:
+                self.in_flight -= 1
+
+
+class FakeHttp:
+
+    def __init__(self, store, file_id):
+        self.store = store
+        self.file_id = file_id
+
+    def request(self, uri, method='GET', headers=None, **kwargs):
+        return self.store.serve_range(self.file_id, headers or {})
+
+
+class FakeMediaRequest:
+    """ What `MediaIoBaseDownload` reads from a `get_media` request: `uri`, `headers` and `http` """
+
+    def __init__(self, store, file_id):
+        self.uri = f'https://fake.drive/files/{file_id}?alt=media'
+        self.headers = {}
+        self.http = FakeHttp(store, file_id)
+
+
+class FakeFilesResource:
+
+    def __init__(self, store):
+        self.store = store
+
+    def list(self, q=None, pageSize=100, fields=None, pageToken=None, **kwargs):
+        with self.store._lock:
+            self.store.list_calls += 1
+        folder_id = re.match(r"'([^']+)' in parents", q).group(1)
+        matching = [self.store.metadata(file_id) for file_id, file in self.store.files.items()
+                    if folder_id in file.get('parents', [])]
+        start = int(pageToken or 0)
+        response = {'files': matching[start:start + pageSize]}
+        if start + pageSize < len(matching):
+            response['nextPageToken'] = str(start + pageSize)
+        return FakeCall(response)
+
+    def get(self, fileId, fields=None, **kwargs):
+        return FakeCall(self.store.metadata(fileId))
+
+    def get_media(self, fileId, **kwargs):
+        return FakeMediaRequest(self.store, fileId)
+
+
+class FakeDriveService:
+    """ Minimal stand-in of the Drive v3 service: `files().list/get/get_media` over a `FakeDriveStore` """
+
+    def __init__(self, store):
+        self.store = store
+
+    def files(self):
+        return FakeFilesResource(self.store)
@@ -0,0 +1,91 @@
+import hashlib
+import os
+import threading
+
+import pytest
+
+pytest.importorskip('googleapiclient')
+pytest.importorskip('tqdm')
+
+from src.gcs_utils.gcs_operations import GoogleDriveFolderManager
+from tests.fake_drive import FakeDriveService, FakeDriveStore
+
+FOLDER_ID = 'folder-1'
+
+
+def make_store(file_count=6, chunk_size=1000, latency=0.0):
+    files = []
+    for i in range(file_count):
+        content = os.urandom(5000 + i * 777)
+        files.append({'id': f'id-{i}', 'name': f'statement_{i}.pdf', 'mimeType': 'application/pdf',
+                      'parents': [FOLDER_ID], 'size': str(len(content)),
+                      'md5Checksum': hashlib.md5(content).hexdigest(), 'content': content})
+    return FakeDriveStore(files, chunk_size=chunk_size, latency=latency)
+
+
+def test_list_files_follows_pagination():
+    store = make_store(file_count=5)
+    manager = GoogleDriveFolderManager(FakeDriveService(store))
+
+    files = manager.list_files(FOLDER_ID, page_size=2)
+
+    assert [file['id'] for file in files] == [f'id-{i}' for i in range(5)]
+    assert store.list_calls == 3
+
+
+def test_download_files_concurrently_with_streaming_md5(tmp_path):
+    store = make_store(latency=0.02)
+    services = []
+    lock = threading.Lock()
+
+    def service_factory():
+        service = FakeDriveService(store)
+        with lock:
+            services.append(service)
+        return service
+
+    manager = GoogleDriveFolderManager(FakeDriveService(store), service_factory=service_factory)
+    files = manager.list_files(FOLDER_ID, page_size=1000)
+
+    results = manager.download_files(files, str(tmp_path), max_workers=3)
+
+    # Input order is kept, every file went through several chunks and its MD5 matches Drive's
+    assert [metadata['id'] for _, metadata in results] == [file['id'] for file in files]
+    for destination_path, metadata in results:
+        content = store.files[metadata['id']]['content']
+        assert metadata['local_md5Checksum'] == metadata['md5Checksum']
+        assert metadata['local_size'] == len(content) > store.chunk_size
+        with open(destination_path, 'rb') as f:
+            assert f.read() == content
+
+    # One client per worker thread, used at the same time
+    assert 1 < len(services) <= 3
+    assert store.max_in_flight > 1
+
+
+def test_failed_download_is_left_out(tmp_path):
+    store = make_store(file_count=3)
+    manager = GoogleDriveFolderManager(FakeDriveService(store), service_factory=lambda: FakeDriveService(store))
+    files = manager.list_files(FOLDER_ID, page_size=1000)
+    files[1] = dict(files[1], id='missing')
+
+    results = manager.download_files(files, str(tmp_path), max_workers=2)
+
+    assert [metadata['id'] for _, metadata in results] == ['id-0', 'id-2']
+
+
+def test_duplicate_names_get_their_own_destination(tmp_path):
+    store = make_store(file_count=3, latency=0.02)
+    for file in store.files.values():
+        file['name'] = 'Statement.pdf'
+    store.files['id-2']['name'] = 'statement.PDF'
+    manager = GoogleDriveFolderManager(FakeDriveService(store), service_factory=lambda: FakeDriveService(store))
+    files = manager.list_files(FOLDER_ID, page_size=1000)
+
+    results = manager.download_files(files, str(tmp_path), max_workers=3)
+
+    assert [os.path.basename(path) for path, _ in results] == ['Statement.pdf', 'Statement_1.pdf', 'statement_2.PDF']
+    for destination_path, metadata in results:
+        assert metadata['local_name'] == os.path.basename(destination_path)
+        with open(destination_path, 'rb') as f:
+            assert f.read() == store.files[metadata['id']]['content']
@@ -0,0 +1,61 @@
+from datetime import timedelta
+from functools import partial
+
+import pytest
+
+from constants import IFSCConstants
+from src.db_operations.ifsc_cache import IFSCCache
+
+
+@pytest.fixture(autouse=True)
+def clear_memory():
+    # The in-process memo is shared by every instance, so each test starts cold
+    IFSCCache._memory.clear()
+    yield
+    IFSCCache._memory.clear()
+
+
+@pytest.fixture
+def cache(tmp_path):
+    return IFSCCache(db_path=str(tmp_path / 'ifsc_cache.db'))
+
+
+def test_preload_from_dump(cache):
+    loaded = cache.preload_from_dump(dump_path=IFSCConstants.LOCAL_DUMP_PATH)
+
+    assert loaded > 0
+    assert cache.get_bank_name('hdfc0000001') == 'HDFC Bank'
+    # Unknown branch of a preloaded bank is resolved from its bank code
+    assert cache.get_bank_name('SBIN0009999') == 'State Bank of India'
+    assert cache.get_bank_name('ZZZZ0000001') is None
+
+
+def test_entries_expire_after_ttl(cache, monkeypatch):
+    cache.put('UTIB0000001', 'Axis Bank')
+    assert cache.get_bank_name('UTIB0000001') == 'Axis Bank'
+
+    now = IFSCCache._now()
+    monkeypatch.setattr(IFSCCache, '_now', staticmethod(lambda: now + timedelta(days=cache.ttl_days + 1)))
+    IFSCCache._memory.clear()
+
+    assert cache.get_bank_name('UTIB0000001') is None
+
+
+def test_offline_mode_never_calls_the_api(tmp_path, monkeypatch):
+    pytest.importorskip('pdfplumber')
+    from src.data_processor import data_extraction
+
+    def no_network(*args, **kwargs):
+        raise AssertionError('IFSC API called in offline mode')
+
+    monkeypatch.setattr(IFSCConstants, 'OFFLINE', True)
+    monkeypatch.setattr(data_extraction.requests, 'get', no_network)
+    monkeypatch.setattr(data_extraction, 'IFSCCache', partial(IFSCCache, db_path=str(tmp_path / 'ifsc_cache.db')))
+
+    handler = data_extraction.DataHandler.__new__(data_extraction.DataHandler)
+    monkeypatch.setattr(handler, 'get_account_ifsc', lambda: 'ICIC0000001')
+    assert handler.get_bank_name_from_ifsc() is None
+
+    # Cached codes are still resolved while offline
+    IFSCCache(db_path=str(tmp_path / 'ifsc_cache.db')).put('ICIC0000001', 'ICICI Bank', source='dump')
+    assert handler.get_bank_name_from_ifsc() == 'ICICI Bank'
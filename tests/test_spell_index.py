@@ -0,0 +1,36 @@
+from src.components.spell_index import SymSpellIndex
+
+KEYWORDS = ['cc', 'ach', 'rent', 'swiggy', 'zomato', 'salary']
+
+
+def make_index(**kwargs):
+    return SymSpellIndex(KEYWORDS, max_edit_distance=2, **kwargs)
+
+
+def test_short_tokens_are_only_matched_exactly():
+    index = make_index()
+
+    assert index.correction('ok') is None
+    assert index.correction('abcd') is None
+    assert index.correction('cc') == 'cc'
+    assert index.correction('ach') == 'ach'
+
+
+def test_english_words_are_not_corrected():
+    index = make_index(skip_words={'sale', 'salami'})
+
+    assert index.correction('salami') is None
+    assert index.correction('salarry') == 'salary'
+
+
+def test_edit_distance_grows_with_token_length():
+    index = make_index()
+
+    # Below 6 characters: one edit at most
+    assert index.correction('rnet') == 'rent'
+    assert index.correction('swigy') == 'swiggy'
+    assert index.correction('zmto') is None
+    # From 6 characters: up to `max_edit_distance`
+    assert index.correction('zmatoo') == 'zomato'
+    assert index.get_max_edit_distance('zmto') == 1
+    assert index.get_max_edit_distance('zmatoo') == 2